@@ -0,0 +1,50 @@
+import argparse
+import json
+import timeit
+from typing import List
+
+import requests
+
+from core.clients import codec
+from core.data.booking_factory import BookingFactory
+from core.models.booking import BookingId, BookingResponse
+from core.models.validation import validate_json
+
+
+def make_response(payload) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json; charset=utf-8'
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def run(number, ids_count):
+    booking = BookingFactory(seed=1, pool_size=100).booking()
+    booking_response = make_response({'bookingid': 1, 'booking': booking})
+    ids_response = make_response([{'bookingid': index} for index in range(ids_count)])
+
+    cases = {
+        'booking: response.json() + BookingResponse(**)': lambda: BookingResponse(**booking_response.json()),
+        'booking: validate_json(BookingResponse)': lambda: validate_json(BookingResponse, booking_response.content),
+        f'ids[{ids_count}]: response.json() + BookingId(**) per item': lambda: [BookingId(**item) for item in ids_response.json()],
+        f'ids[{ids_count}]: validate_json(List[BookingId])': lambda: validate_json(List[BookingId], ids_response.content),
+        'request body: json.dumps': lambda: json.dumps(booking).encode(),
+        f'request body: codec.dumps ({"orjson" if codec.orjson else "json"})': lambda: codec.dumps(booking),
+    }
+    for name, case in cases.items():
+        repeat = max(1, number // 100) if name.startswith('ids') else number
+        seconds = min(timeit.repeat(case, number=repeat, repeat=5)) / repeat
+        print(f'{name:<60}{seconds * 1e6:>12.2f} us/call')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare response decode and validation paths')
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--ids', type=int, default=10000, help='size of the bookings id list')
+    args = parser.parse_args(argv)
+    run(args.number, args.ids)
+
+
+if __name__ == '__main__':
+    main()
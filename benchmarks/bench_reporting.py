@@ -0,0 +1,61 @@
+import argparse
+import time
+import timeit
+
+import allure_commons
+
+from core.reporting import steps
+from core.settings.config import ReportingLevel
+
+
+class StepRecorder:
+    # stands in for the allure-pytest listener, which keeps every started step in memory
+    def __init__(self):
+        self.steps = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self.steps[uuid] = {'title': title, 'params': params}
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        self.steps.pop(uuid, None)
+
+
+STEPS_PER_CALL = 2
+
+
+def api_call():
+    # the shape of a typical APIClient method: a request step and a status check step
+    with steps.step('Getting booking by id'):
+        pass
+    with steps.step('Assert status code'):
+        pass
+
+
+def run(number):
+    recorder = StepRecorder()
+    previous = steps.get_level()
+    allure_commons.plugin_manager.register(recorder)
+    try:
+        for level in ReportingLevel:
+            steps.set_level(level)
+            seconds = min(timeit.repeat(api_call, number=number, repeat=5)) / number
+            started = time.perf_counter()
+            flushed = steps.flush()
+            flush = (time.perf_counter() - started) / (flushed / STEPS_PER_CALL) if flushed else 0.0
+            print(f'{level.value:<10}{seconds * 1e6:>12.2f} us/call{flush * 1e6:>12.2f} us/call at flush')
+    finally:
+        allure_commons.plugin_manager.unregister(recorder)
+        steps.set_level(previous)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure per-call allure step overhead of each reporting level')
+    parser.add_argument('--number', type=int, default=10000)
+    args = parser.parse_args(argv)
+    run(args.number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+_reported = False
+
+
+def pytest_runtest_logreport(report):
+    # loaded into the measured pytest process with -p
+    global _reported
+    if _reported or report.when != 'call':
+        return
+    _reported = True
+    with open(os.environ['BENCH_STARTUP_OUTPUT'], 'w') as file:
+        file.write(str(time.time() - float(os.environ['BENCH_STARTUP_STARTED'])))
+
+
+def measure(target, extra_args=()):
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'first_result')
+        env = dict(os.environ, BENCH_STARTUP_OUTPUT=output)
+        env.setdefault('ENVIRONMENT', 'TEST')
+        env['BENCH_STARTUP_STARTED'] = str(time.time())
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'pytest', '-q', '-p', 'benchmarks.bench_startup', '-p', 'no:cacheprovider', *extra_args, target],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        total = time.perf_counter() - started
+        with open(output) as file:
+            return float(file.read()), total
+
+
+def run(target, repeat, extra_args):
+    results = [measure(target, extra_args) for _ in range(repeat)]
+    first = [result[0] for result in results]
+    total = [result[1] for result in results]
+    print(f'{"time to first test result":<30}{min(first) * 1000:>10.1f} ms min{statistics.median(first) * 1000:>10.1f} ms median')
+    print(f'{"whole run":<30}{min(total) * 1000:>10.1f} ms min{statistics.median(total) * 1000:>10.1f} ms median')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure pytest startup up to the first test result')
+    parser.add_argument('target', nargs='?', default='tests/test_health_check.py::test_ping_wrong_method')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('pytest_args', nargs=argparse.REMAINDER, help='extra pytest arguments after --')
+    args = parser.parse_args(argv)
+    run(args.target, args.repeat, [arg for arg in args.pytest_args if arg != '--'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,116 @@
+import os
+import warnings
+import zlib
 import pytest
+import pytest_asyncio
 
-from faker import Faker
 from core.clients.api_client import APIClient
+from core.clients.cassette import active_cassette
+from core.clients.token_cache import TokenCache
+from core.data.booking_factory import BookingFactory
+from core.data.namespace import namespaced, run_id, run_tag
+from core.settings.environment import Environment
 from datetime import datetime, timedelta
 
+pytest_plugins = ['core.plugins.sharding', 'core.plugins.timing', 'core.plugins.metrics', 'core.plugins.reporting']
+
+
+def booking_seed():
+    return int(os.getenv('BOOKING_SEED') or zlib.crc32(run_id().encode()))
+
+def pytest_report_header(config):
+    return f'booking data seed: {booking_seed()} (set BOOKING_SEED to reproduce)'
+
+@pytest.fixture(scope='session', autouse=True)
+def local_booking_server():
+    if os.getenv('ENVIRONMENT') != Environment.LOCAL.value:
+        yield None
+        return
+    from core.server.booking_server import BookingServer
+
+    with BookingServer() as server:
+        previous_url = os.environ.get('LOCAL_BASE_URL')
+        os.environ['LOCAL_BASE_URL'] = server.url
+        yield server
+        if previous_url is None:
+            os.environ.pop('LOCAL_BASE_URL', None)
+        else:
+            os.environ['LOCAL_BASE_URL'] = previous_url
+
+@pytest.fixture(scope='session', autouse=True)
+def cassette():
+    cassette = active_cassette()
+    yield cassette
+    if cassette is not None:
+        cassette.save()
+
+@pytest.fixture(autouse=True)
+def cassette_scope(request, cassette):
+    if cassette is None:
+        yield None
+        return
+    cassette.scope = request.node.nodeid
+    yield cassette
+    cassette.scope = None
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture()
+def fake_clock():
+    return FakeClock()
+
+@pytest.fixture()
+def offline_policy():
+    return None
+
+@pytest.fixture()
+def offline_client(monkeypatch, offline_policy):
+    # a client that is never meant to reach the service; modules override offline_policy to configure it
+    monkeypatch.setenv('ENVIRONMENT', 'TEST')
+    monkeypatch.delenv('CASSETTE_PATH', raising=False)
+    return APIClient(offline_policy)
+
+@pytest.fixture(scope='session')
+def worker_namespace():
+    return run_tag()
 
 @pytest.fixture(scope='session')
 def api_client():
-    client = APIClient()
-    client.auth()
-    return client
+    # authentication happens on the first call that needs it
+    client = APIClient(token_cache=TokenCache())
+    yield client
+    _delete_recorded_bookings(client, client.registries[0])
+
+def _delete_recorded_bookings(client, registry):
+    failed = registry.teardown(client)
+    if failed:
+        warnings.warn(f'Could not delete {len(failed)} bookings recorded in {registry.name} registry: {failed[:10]}')
+
+@pytest.fixture(scope='module')
+def module_booking_registry(api_client):
+    registry = api_client.push_registry('module')
+    yield registry
+    api_client.pop_registry(registry)
+    _delete_recorded_bookings(api_client, registry)
+
+@pytest.fixture()
+def booking_registry(api_client):
+    registry = api_client.push_registry('test')
+    yield registry
+    api_client.pop_registry(registry)
+    _delete_recorded_bookings(api_client, registry)
+
+@pytest_asyncio.fixture()
+async def async_api_client():
+    from core.clients.async_api_client import AsyncAPIClient
+
+    async with AsyncAPIClient() as client:
+        yield client
 
 @pytest.fixture()
 def booking_dates():
@@ -21,22 +122,16 @@ def booking_dates():
         'checkout': checkout_date.strftime('%Y-%m-%d')
     }
 
-@pytest.fixture()
-def generate_random_booking_data(booking_dates):
-    faker = Faker()
-    firstname = faker.first_name()
-    lastname = faker.last_name()
-    totalprice = faker.random_number(digits=3)
-    depositpaid = faker.boolean()
-    additionalneeds = faker.sentence()
-
-    data = {
-        'firstname': firstname,
-        'lastname': lastname,
-        'totalprice': totalprice,
-        'depositpaid': depositpaid,
-        'bookingdates': booking_dates,
-        'additionalneeds': additionalneeds
-    }
+@pytest.fixture(scope='session')
+def booking_factory(cassette):
+    seed = booking_seed() if cassette is None else cassette.pin_seed(booking_seed())
+    return BookingFactory(seed=seed)
 
-    return data
+@pytest.fixture()
+def generate_random_booking_data(request, booking_dates, worker_namespace, booking_factory, cassette):
+    if cassette is not None:
+        # replayed requests must not depend on which tests ran earlier on the same worker
+        booking_factory.reseed(request.node.nodeid)
+    data = booking_factory.booking()
+    data['bookingdates'] = booking_dates
+    return namespaced(data, worker_namespace)
@@ -1,122 +1,393 @@
 import requests
 import os
-from dotenv import load_dotenv
+import threading
+from typing import List
 from requests.auth import HTTPBasicAuth
 
-from core.settings.environment import Environment
+from core.settings.environment import Environment, load_env
 from core.clients.endpoints import Endpoints
-from core.settings.config import Users, Timeouts
-import allure
+from core.clients.transport import TransportPolicy, CircuitBreaker, resolve_endpoint
+from core.clients.bulk import run_bulk
+from core.clients.streaming import iter_json_array
+from core.clients.cache import BookingCache, MISSING
+from core.clients.booking_index import BookingIndex
+from core.clients.token_cache import TokenCache
+from core.clients.cassette import Cassette, active_cassette
+from core.clients.throttle import Throttle, retry_after
+from core.clients.singleflight import SingleFlight, IDS_SCOPE
+from core.clients.backends import BackendPool, split_urls
+from core.clients.registry import BookingRegistry
+from core.clients import codec
+from core.reporting.steps import step
+from core.metrics.instrumentation import RequestMetrics, REQUEST_METRICS
+from core.settings.config import Users, BookingFilters, Streaming, Failover
 
-load_dotenv()
+
+def _model(name):
+    # pydantic is only imported once a caller asks for validation
+    from core.models import booking
+
+    return getattr(booking, name)
+
+def _jsonable(value):
+    if value is None or isinstance(value, dict) or (isinstance(value, list) and all(isinstance(item, dict) for item in value)):
+        return value
+    from core.models.validation import to_jsonable
+
+    return to_jsonable(value)
 
 class APIClient:
-    def __init__(self):
+    def __init__(self, policy: TransportPolicy = None, cache: BookingCache = None, token_cache: TokenCache = None,
+                 metrics: RequestMetrics = None, cassette: Cassette = None, throttle: Throttle = None,
+                 single_flight: SingleFlight = None, index: BookingIndex = None, backends: BackendPool = None):
+        load_env()
         environment_str = os.getenv('ENVIRONMENT')
         try:
             environment = Environment[environment_str]
         except KeyError:
             raise ValueError(f'Unsupported environment value: {environment_str}')
 
-        self.base_url = self.get_base_url(environment)
-        self.session = requests.Session()
-        self.session.headers = {
+        self.environment = environment
+        base_url = self.get_base_url(environment)
+        base_urls = split_urls(base_url)
+        if backends is None and len(base_urls) > 1:
+            backends = BackendPool.shared(base_urls)
+        self.backends = backends
+        # urls are built against the primary backend and rerouted per request
+        self.base_url = backends.primary if backends is not None else base_url
+        self.policy = policy or TransportPolicy.from_env()
+        self.cassette = cassette if cassette is not None else active_cassette()
+        self.session = self._new_session({
             'Content-Type': 'application/json'
-        }
+        })
+        self.circuit_breaker = CircuitBreaker(
+            self.policy.failure_threshold, self.policy.reset_timeout, self.policy.failure_statuses
+        )
+        self._circuit_breakers = {}
+        self._breakers_lock = threading.Lock()
+        self.cache = cache
+        self.token_cache = token_cache
+        self.metrics = metrics or REQUEST_METRICS
+        self.throttle = throttle if throttle is not None else Throttle.shared(environment)
+        self.single_flight = single_flight or SingleFlight()
+        self.index = index
+        self.token = None
+        self.registries = [BookingRegistry()]
+
+    @property
+    def registry(self) -> BookingRegistry:
+        return self.registries[-1]
+
+    def push_registry(self, name) -> BookingRegistry:
+        registry = BookingRegistry(name)
+        self.registries.append(registry)
+        return registry
+
+    def pop_registry(self, registry):
+        self.registries.remove(registry)
 
     def get_base_url(self, environment: Environment) -> str:
         if environment == Environment.TEST:
             return os.getenv('TEST_BASE_URL')
         elif environment == Environment.PROD:
             return os.getenv('PROD_BASE_URL')
+        elif environment == Environment.LOCAL:
+            return os.getenv('LOCAL_BASE_URL')
         else:
             raise ValueError(f'Unsupported environment: {environment}')
 
+    def _new_session(self, headers):
+        self._pid = os.getpid()
+        session = requests.Session()
+        session.headers = dict(headers)
+        self.policy.mount(session)
+        if self.cassette is not None:
+            self.cassette.mount(session)
+        return session
+
+    def _request(self, method, endpoint, url, **kwargs):
+        if self._pid != os.getpid():
+            # pooled sockets inherited from a parent process must not be shared with it
+            self.session = self._new_session(self.session.headers)
+        endpoint = resolve_endpoint(endpoint)
+        kwargs.setdefault('timeout', self.policy.timeout_for(endpoint))
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        backend = None
+        if self.backends is not None:
+            url, backend = self.backends.route(url, method)
+        circuit_breaker = self._circuit_breaker(backend)
+        circuit_breaker.before_call()
+        limiter = self.throttle.limiter(endpoint, path) if self.throttle is not None else None
+        started = limiter.acquire() if limiter is not None else None
+        call = self.metrics.start(endpoint, method, url)
+        try:
+            response = getattr(self.session, method)(url, **kwargs)
+        except Exception:
+            self.metrics.finish(call)
+            circuit_breaker.record_failure()
+            if limiter is not None:
+                limiter.release(started, error=True)
+            if backend is not None:
+                self.backends.record_failure(backend)
+            raise
+        self.metrics.finish(call, response)
+        circuit_breaker.record_response(response.status_code)
+        if limiter is not None:
+            limiter.release(started, response.status_code, retry_after=retry_after(response.headers))
+        if backend is not None:
+            if response.status_code in Failover.FAILURE_STATUSES.value:
+                self.backends.record_failure(backend)
+            else:
+                self.backends.record_success(backend)
+        return response
+
+    def _circuit_breaker(self, backend) -> CircuitBreaker:
+        # failures of one replica must not stop requests to the others, so each backend gets its own breaker;
+        # the primary keeps circuit_breaker
+        if backend is None or backend is self.backends.backends[0]:
+            return self.circuit_breaker
+        with self._breakers_lock:
+            if backend.url not in self._circuit_breakers:
+                self._circuit_breakers[backend.url] = CircuitBreaker(
+                    self.policy.failure_threshold, self.policy.reset_timeout, self.policy.failure_statuses
+                )
+            return self._circuit_breakers[backend.url]
+
+    def _decode(self, response, model=None):
+        if model is None:
+            return codec.loads(response.content)
+        from core.models.validation import validate_json
+
+        return validate_json(model, response.content)
+
+    def _cached(self, key, model=None):
+        return self._validated(self.cache.get(key), model)
+
+    def _validated(self, value, model=None):
+        if value is MISSING or model is None:
+            return value
+        from core.models.validation import adapter_for
+
+        return adapter_for(model).validate_python(value)
+
     def get(self, endpoint, params=None, status_code=200):
         url = self.base_url + endpoint
-        response = self.session.get(url, headers=self.headers, params=params)
+        response = self._request('get', endpoint, url, params=params)
         if status_code:
             assert response.status_code == status_code
-        return response.json()
+        return self._decode(response)
 
     def post(self, endpoint, data=None, status_code=200):
         url = self.base_url + endpoint
-        response = self.session.post(url, headers=self.headers, json=data)
+        response = self._request('post', endpoint, url, data=codec.dumps(data) if data is not None else None)
         if status_code:
             assert response.status_code == status_code
-        return response.json()
+        return self._decode(response)
 
     def ping(self):
-        with allure.step('Ping API client'):
+        with step('Ping API client'):
             url = f'{self.base_url}{Endpoints.PING_ENDPOINT.value}'
-            response = self.session.get(url)
+            response = self._request('get', Endpoints.PING_ENDPOINT, url)
             response.raise_for_status()
-        with allure.step('Assert status code'):
+        with step('Assert status code'):
             assert response.status_code == 201, f'Expected status code 201 but got {response.status_code}'
         return response.status_code
 
-    def auth(self):
-        with allure.step('Getting authenticate'):
+    def _fetch_token(self):
+        with step('Getting authenticate'):
             url = f'{self.base_url}{Endpoints.AUTH_ENDPOINT.value}'
             payload = {'username': Users.USERNAME.value, 'password': Users.PASSWORD.value}
-            response = self.session.post(url, json=payload, timeout=Timeouts.TIMEOUT.value)
+            response = self._request('post', Endpoints.AUTH_ENDPOINT, url, data=codec.dumps(payload))
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        token = response.json().get('token')
-        with allure.step('Updating header with authorization'):
+        return self._decode(response).get('token')
+
+    def auth(self, force=False):
+        if self.token_cache is None:
+            token = self._fetch_token()
+        else:
+            key = TokenCache.key(self.environment, self.base_url, Users.USERNAME.value)
+            if force:
+                self.token_cache.invalidate(key, self.token)
+            token = self.token_cache.get_or_fetch(key, self._fetch_token)
+        self.token = token
+        with step('Updating header with authorization'):
             self.session.headers.update({'Authorization' : f'Bearer {token}'})
 
-    def get_booking_by_id(self, booking_id):
-        with allure.step('Getting booking by id'):
+    def _authorized_request(self, method, url, **kwargs):
+        if self.token is None:
+            self.auth()
+        if self.token is None:
+            return self._request(method, Endpoints.BOOKING_ENDPOINT, url, auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value), **kwargs)
+        response = self._request(method, Endpoints.BOOKING_ENDPOINT, url, headers={'Cookie': f'token={self.token}'}, **kwargs)
+        if response.status_code == 403:
+            with step('Re-authenticating after 403'):
+                self.auth(force=True)
+            response = self._request(method, Endpoints.BOOKING_ENDPOINT, url, headers={'Cookie': f'token={self.token}'}, **kwargs)
+        return response
+
+    def get_booking_by_id(self, booking_id, use_cache=True, validate=False):
+        model = _model('Booking') if validate else None
+        if self.cache is not None and use_cache:
+            cached = self._cached(BookingCache.booking_key(booking_id), model)
+            if cached is not MISSING:
+                return cached
+        key = BookingCache.booking_key(booking_id)
+        return self.single_flight.do((key, validate), lambda: self._fetch_booking(booking_id, model), scopes=(key,))
+
+    def _fetch_booking(self, booking_id, model):
+        with step('Getting booking by id'):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
-            response = self.session.get(url)
+            response = self._request('get', Endpoints.BOOKING_ENDPOINT, url)
             response.raise_for_status()
-        with allure.step('Assert status code'):
+        with step('Assert status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        return response.json()
+        booking = self._decode(response, model)
+        if self.cache is not None:
+            self.cache.set(BookingCache.booking_key(booking_id), _jsonable(booking))
+        return booking
+
+    def get_booking_if_changed(self, booking_id, etag=None, validate=False):
+        with step('Getting booking by id if changed'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
+            headers = {'If-None-Match': etag} if etag else None
+            response = self._request('get', Endpoints.BOOKING_ENDPOINT, url, headers=headers)
+            response.raise_for_status()
+        if response.status_code == 304:
+            return None, etag
+        with step('Assert status code'):
+            assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
+        return self._decode(response, _model('Booking') if validate else None), response.headers.get('ETag')
 
     def delete_booking(self, booking_id):
-        with allure.step('Deleting booking'):
+        with step('Deleting booking'), self.single_flight.barrier(BookingCache.booking_key(booking_id), IDS_SCOPE):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
-            response = self.session.delete(url, auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value))
+            response = self._authorized_request('delete', url)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 201, f'Expected status code 201 but got {response.status_code}'
+        self._cache_booking(booking_id, None)
+        if self.backends is not None:
+            self.backends.unpin(booking_id)
+        for registry in self.registries:
+            registry.forget(booking_id)
         return response.status_code == 201
 
-    def create_booking(self, booking_data):
-        with allure.step('Creating booking'):
+    def create_booking(self, booking_data, validate=False):
+        with step('Creating booking'), self.single_flight.barrier(IDS_SCOPE):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}'
-            response = self.session.post(url, headers={'Accept': 'application/json'}, json=booking_data)
+            response = self._request('post', Endpoints.BOOKING_ENDPOINT, url, headers={'Accept': 'application/json'}, data=codec.dumps(booking_data))
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        return response.json()
+        if validate:
+            created = self._decode(response, _model('BookingResponse'))
+            booking_id, booking = created.bookingid, created.booking
+        else:
+            created = self._decode(response)
+            booking_id, booking = created.get('bookingid'), created.get('booking')
+        if booking_id is not None:
+            self.registry.record(booking_id)
+        if self.backends is not None:
+            self.backends.pin(booking_id, response.url)
+        self._cache_booking(booking_id, booking)
+        return created
 
-    def get_bookings_ids(self, params=None):
-        with allure.step('Getting object with bookings'):
+    def get_bookings_ids(self, params=None, use_cache=True, validate=False):
+        model = List[_model('BookingId')] if validate else None
+        if self.index is not None and use_cache:
+            # other servers are not known to share the local server's date semantics, so only it gets date filters answered
+            found = self.index.query(params, date_filters=self.environment is Environment.LOCAL)
+            if found is not None:
+                return self._validated(found, model)
+        if self.cache is not None and use_cache:
+            cached = self._cached(BookingCache.ids_key(params), model)
+            if cached is not MISSING:
+                return cached
+        key = BookingCache.ids_key(params)
+        return self.single_flight.do((key, validate), lambda: self._fetch_bookings_ids(params, model), scopes=(IDS_SCOPE,))
+
+    def _fetch_bookings_ids(self, params, model):
+        with step('Getting object with bookings'):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}'
-            response = self.session.get(url, params=params)
+            response = self._request('get', Endpoints.BOOKING_ENDPOINT, url, params=params)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        return response.json()
+        bookings_ids = self._decode(response, model)
+        if self.cache is not None:
+            self.cache.set(BookingCache.ids_key(params), _jsonable(bookings_ids))
+        return bookings_ids
 
-    def update_booking(self, booking_id, booking_data):
-        with allure.step('Updating booking'):
+    def iter_bookings_ids(self, params=None, chunk_size=Streaming.CHUNK_SIZE.value):
+        unsupported = set(dict(params or {})) - {booking_filter.value for booking_filter in BookingFilters}
+        if unsupported:
+            raise ValueError(f'Unsupported booking filters: {sorted(unsupported)}')
+        with step('Streaming bookings ids'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}'
+            response = self._request('get', Endpoints.BOOKING_ENDPOINT, url, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
+            for item in iter_json_array(response.iter_content(chunk_size=chunk_size)):
+                yield item['bookingid']
+        finally:
+            response.close()
+
+    def iter_bookings(self, params=None, prefetch=Streaming.PREFETCH.value):
+        return run_bulk(self.get_booking_by_id, self.iter_bookings_ids(params), self.policy.workers_for(prefetch), window=prefetch)
+
+    def update_booking(self, booking_id, booking_data, validate=False):
+        with step('Updating booking'), self.single_flight.barrier(BookingCache.booking_key(booking_id), IDS_SCOPE):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
-            response = self.session.put(url, auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value), json=booking_data)
+            response = self._authorized_request('put', url, data=codec.dumps(booking_data))
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        return response.json()
+        booking = self._decode(response, _model('Booking') if validate else None)
+        self._cache_booking(booking_id, booking)
+        return booking
 
-    def partial_update_booking(self, booking_id, booking_data):
-        with allure.step('Updating booking'):
+    def partial_update_booking(self, booking_id, booking_data, validate=False):
+        with step('Updating booking'), self.single_flight.barrier(BookingCache.booking_key(booking_id), IDS_SCOPE):
             url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
-            response = self.session.patch(url, auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value), json=booking_data)
+            response = self._authorized_request('patch', url, data=codec.dumps(booking_data))
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f'Expected status code 200 but got {response.status_code}'
-        return response.json()
+        booking = self._decode(response, _model('Booking') if validate else None)
+        self._cache_booking(booking_id, booking)
+        return booking
+
+    def _cache_booking(self, booking_id, booking):
+        if booking_id is None:
+            return
+        if self.index is not None:
+            self.index.put(booking_id, _jsonable(booking))
+        if self.cache is None:
+            return
+        self.cache.invalidate_ids()
+        if booking is None:
+            self.cache.invalidate(BookingCache.booking_key(booking_id))
+        else:
+            self.cache.set(BookingCache.booking_key(booking_id), _jsonable(booking))
+
+    def _bulk(self, title, func, items, max_workers=None, stream=False):
+        results = run_bulk(func, items, self.policy.workers_for(max_workers))
+        if stream:
+            return results
+        with step(title):
+            return list(results)
+
+    def create_bookings_bulk(self, bookings, max_workers=None, stream=False):
+        return self._bulk('Creating bookings in bulk', self.create_booking, bookings, max_workers, stream)
+
+    def get_bookings_bulk(self, booking_ids, max_workers=None, stream=False):
+        return self._bulk('Getting bookings in bulk', self.get_booking_by_id, booking_ids, max_workers, stream)
+
+    def update_bookings_bulk(self, updates, max_workers=None, stream=False):
+        return self._bulk('Updating bookings in bulk', lambda update: self.update_booking(*update), updates, max_workers, stream)
+
+    def delete_bookings_bulk(self, booking_ids, max_workers=None, stream=False):
+        return self._bulk('Deleting bookings in bulk', self.delete_booking, booking_ids, max_workers, stream)
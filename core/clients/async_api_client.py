@@ -0,0 +1,203 @@
+import asyncio
+import os
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from core.settings.environment import Environment, load_env
+from core.clients.endpoints import Endpoints
+from core.clients.throttle import Throttle, retry_after
+from core.settings.config import Users, Timeouts, Concurrency
+from core.reporting.steps import step
+
+
+class AsyncAPIClient:
+    def __init__(self, concurrency=Concurrency.MAX_CONCURRENCY.value, throttle: Throttle = None):
+        load_env()
+        environment_str = os.getenv('ENVIRONMENT')
+        try:
+            environment = Environment[environment_str]
+        except KeyError:
+            raise ValueError(f'Unsupported environment value: {environment_str}')
+
+        self.base_url = self.get_base_url(environment)
+        self.concurrency = concurrency
+        self.headers = {
+            'Content-Type': 'application/json'
+        }
+        self.token = None
+        self.session = None
+        self.throttle = throttle if throttle is not None else Throttle.shared(environment)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_base_url(self, environment: Environment) -> str:
+        if environment == Environment.TEST:
+            return os.getenv('TEST_BASE_URL')
+        elif environment == Environment.PROD:
+            return os.getenv('PROD_BASE_URL')
+        elif environment == Environment.LOCAL:
+            return os.getenv('LOCAL_BASE_URL')
+        else:
+            raise ValueError(f'Unsupported environment: {environment}')
+
+    async def open(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            trace_configs = [self._throttle_trace()] if self.throttle is not None else None
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=connector, trace_configs=trace_configs)
+        return self.session
+
+    def _throttle_trace(self):
+        async def on_request_start(session, context, params):
+            path = self._relative(params.url)
+            context.limiter = self.throttle.limiter(path, path)
+            context.started = await context.limiter.acquire_async()
+
+        async def on_request_end(session, context, params):
+            context.limiter.release(context.started, params.response.status, retry_after=retry_after(params.response.headers))
+
+        async def on_request_exception(session, context, params):
+            if getattr(context, 'started', None) is not None:
+                context.limiter.release(context.started, error=True)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    def _relative(self, url) -> str:
+        # endpoints are matched below the base url, which may carry a path prefix of its own
+        url, base = str(url), (self.base_url or '').rstrip('/')
+        return url[len(base):] if base and url.startswith(base + '/') else urlsplit(url).path
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def gather(self, *coros, limit=None, return_exceptions=False):
+        semaphore = asyncio.Semaphore(limit or self.concurrency)
+
+        async def run(coro):
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
+
+    async def get(self, endpoint, params=None, status_code=200):
+        session = await self.open()
+        url = self.base_url + endpoint
+        async with session.get(url, params=params) as response:
+            if status_code:
+                assert response.status == status_code
+            return await response.json(content_type=None)
+
+    async def post(self, endpoint, data=None, status_code=200):
+        session = await self.open()
+        url = self.base_url + endpoint
+        async with session.post(url, json=data) as response:
+            if status_code:
+                assert response.status == status_code
+            return await response.json(content_type=None)
+
+    async def ping(self):
+        session = await self.open()
+        with step('Ping API client'):
+            url = f'{self.base_url}{Endpoints.PING_ENDPOINT.value}'
+            async with session.get(url) as response:
+                response.raise_for_status()
+        with step('Assert status code'):
+            assert response.status == 201, f'Expected status code 201 but got {response.status}'
+        return response.status
+
+    async def auth(self):
+        session = await self.open()
+        with step('Getting authenticate'):
+            url = f'{self.base_url}{Endpoints.AUTH_ENDPOINT.value}'
+            payload = {'username': Users.USERNAME.value, 'password': Users.PASSWORD.value}
+            timeout = aiohttp.ClientTimeout(total=Timeouts.TIMEOUT.value)
+            async with session.post(url, json=payload, timeout=timeout) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Checking status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        with step('Saving authorization token'):
+            self.token = body.get('token')
+
+    def _write_auth(self) -> dict:
+        # the token goes in a cookie, like the sync client's writes; without one writes fall back to BasicAuth
+        if self.token:
+            return {'headers': {'Cookie': f'token={self.token}'}}
+        return {'auth': aiohttp.BasicAuth(Users.USERNAME.value, Users.PASSWORD.value)}
+
+    async def get_booking_by_id(self, booking_id):
+        session = await self.open()
+        with step('Getting booking by id'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
+            async with session.get(url) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Assert status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        return body
+
+    async def delete_booking(self, booking_id):
+        session = await self.open()
+        with step('Deleting booking'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
+            async with session.delete(url, **self._write_auth()) as response:
+                response.raise_for_status()
+        with step('Checking status code'):
+            assert response.status == 201, f'Expected status code 201 but got {response.status}'
+        return response.status == 201
+
+    async def create_booking(self, booking_data):
+        session = await self.open()
+        with step('Creating booking'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}'
+            async with session.post(url, headers={'Accept': 'application/json'}, json=booking_data) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Checking status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        return body
+
+    async def get_bookings_ids(self, params=None):
+        session = await self.open()
+        with step('Getting object with bookings'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}'
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Checking status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        return body
+
+    async def update_booking(self, booking_id, booking_data):
+        session = await self.open()
+        with step('Updating booking'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
+            async with session.put(url, json=booking_data, **self._write_auth()) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Checking status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        return body
+
+    async def partial_update_booking(self, booking_id, booking_data):
+        session = await self.open()
+        with step('Updating booking'):
+            url = f'{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}'
+            async with session.patch(url, json=booking_data, **self._write_auth()) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        with step('Checking status code'):
+            assert response.status == 200, f'Expected status code 200 but got {response.status}'
+        return body
@@ -0,0 +1,210 @@
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+
+from core.clients.endpoints import Endpoints
+from core.settings.config import Failover
+
+
+WRITE_METHODS = ('put', 'patch', 'delete')
+
+
+def split_urls(value) -> list:
+    return [url.strip().rstrip('/') for url in (value or '').split(',') if url.strip()]
+
+def booking_id_of(url):
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if len(segments) >= 2 and '/' + segments[-2] == Endpoints.BOOKING_ENDPOINT.value and segments[-1].isdigit():
+        return int(segments[-1])
+    return None
+
+
+class Backend:
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = None
+        self.requests = 0
+
+    @property
+    def available(self) -> bool:
+        return self.ejected_until is None
+
+    def due_for_probe(self, now) -> bool:
+        return self.ejected_until is None or self.ejected_until <= now
+
+    def stats(self, now) -> dict:
+        return {
+            'latency_ms': None if self.latency is None else self.latency * 1000,
+            'healthy': self.ejected_until is None,
+            'ejected_for': max(self.ejected_until - now, 0.0) if self.ejected_until is not None else 0.0,
+            'failures': self.failures,
+            'ejections': self.ejections,
+            'requests': self.requests,
+        }
+
+
+class BackendPool:
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, urls, probe=None, interval=Failover.PROBE_INTERVAL.value, alpha=Failover.EWMA_ALPHA.value,
+                 eject_after=Failover.EJECT_AFTER.value, eject_for=Failover.EJECT_FOR.value,
+                 max_eject_for=Failover.MAX_EJECT_FOR.value, max_pins=Failover.MAX_PINS.value, clock=time.monotonic):
+        if not urls:
+            raise ValueError('At least one base URL is required')
+        self.backends = [Backend(url.rstrip('/')) for url in urls]
+        self.probe = probe or self._ping
+        self.interval = interval
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_for = eject_for
+        self.max_eject_for = max_eject_for
+        self.max_pins = max_pins
+        self.clock = clock
+        self._pins = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._session = None
+
+    @classmethod
+    def shared(cls, urls):
+        # one prober and one set of pins per backend list, however many clients use it
+        key = tuple(urls)
+        with cls._shared_lock:
+            if not cls._shared:
+                atexit.register(cls.stop_shared)
+            if key not in cls._shared:
+                cls._shared[key] = cls(urls).start()
+            return cls._shared[key]
+
+    @classmethod
+    def stop_shared(cls):
+        with cls._shared_lock:
+            pools, cls._shared = list(cls._shared.values()), {}
+        for pool in pools:
+            pool.stop()
+
+    @property
+    def primary(self) -> str:
+        return self.backends[0].url
+
+    def _ping(self, url):
+        if self._session is None:
+            self._session = requests.Session()
+        response = self._session.get(f'{url}{Endpoints.PING_ENDPOINT.value}', timeout=Failover.PROBE_TIMEOUT.value)
+        if response.status_code != 201:
+            raise ConnectionError(f'Ping of {url} returned {response.status_code}')
+
+    def _backend(self, url):
+        for backend in self.backends:
+            if url == backend.url or url.startswith(backend.url + '/'):
+                return backend
+        return None
+
+    def _fastest(self) -> Backend:
+        candidates = [backend for backend in self.backends if backend.available]
+        if not candidates:
+            # with every backend ejected the one due back soonest is still better than failing outright
+            return min(self.backends, key=lambda backend: backend.ejected_until)
+        measured = [backend for backend in candidates if backend.latency is not None]
+        return min(measured, key=lambda backend: backend.latency) if measured else candidates[0]
+
+    def route(self, url, method='get'):
+        base = self._backend(url)
+        if base is None:
+            return url, None
+        booking_id = booking_id_of(url) if method in WRITE_METHODS else None
+        with self._lock:
+            backend = self._pins.get(booking_id) if booking_id is not None else None
+            if backend is None or not backend.available:
+                backend = self._fastest()
+            if booking_id is not None:
+                self._pin(booking_id, backend)
+            backend.requests += 1
+        return backend.url + url[len(base.url):], backend
+
+    def pin(self, booking_id, url):
+        backend = self._backend(url or '')
+        if backend is not None and booking_id is not None:
+            with self._lock:
+                self._pin(booking_id, backend)
+
+    def _pin(self, booking_id, backend):
+        # bookings that are never deleted through this pool would otherwise keep their pins for the whole process
+        self._pins[booking_id] = backend
+        self._pins.move_to_end(booking_id)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+
+    def unpin(self, booking_id):
+        with self._lock:
+            self._pins.pop(booking_id, None)
+
+    def pinned(self, booking_id):
+        with self._lock:
+            backend = self._pins.get(booking_id)
+        return None if backend is None else backend.url
+
+    def record_success(self, backend, latency=None):
+        with self._lock:
+            backend.failures = 0
+            if backend.ejected_until is not None:
+                backend.ejected_until = None
+            if latency is not None:
+                backend.latency = latency if backend.latency is None else self.alpha * latency + (1 - self.alpha) * backend.latency
+
+    def record_failure(self, backend):
+        with self._lock:
+            backend.failures += 1
+            now = self.clock()
+            if backend.failures >= self.eject_after and (backend.ejected_until is None or backend.ejected_until <= now):
+                backend.ejections += 1
+                backend.ejected_until = now + min(self.eject_for * 2 ** (backend.ejections - 1), self.max_eject_for)
+
+    def probe_all(self):
+        now = self.clock()
+        for backend in self.backends:
+            # ejected hosts get no traffic until their ejection has run out and a ping succeeds
+            if not backend.due_for_probe(now):
+                continue
+            started = time.perf_counter()
+            try:
+                self.probe(backend.url)
+            except Exception:
+                self.record_failure(backend)
+            else:
+                self.record_success(backend, time.perf_counter() - started)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.probe_all()
+            self._stopped.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='backend-probe', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            return {backend.url: backend.stats(now) for backend in self.backends}
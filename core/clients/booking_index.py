@@ -0,0 +1,178 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date
+
+from requests import HTTPError
+
+from core.settings.config import BookingFilters, QueryIndex
+
+
+NAME_FILTERS = (BookingFilters.FIRSTNAME.value, BookingFilters.LASTNAME.value)
+DATE_FILTERS = (BookingFilters.CHECKIN.value, BookingFilters.CHECKOUT.value)
+
+
+def _ordinal(value):
+    try:
+        return date.fromisoformat(str(value)).toordinal()
+    except ValueError:
+        return None
+
+
+class _Entry:
+    __slots__ = ('firstname', 'lastname', 'checkin', 'checkout')
+
+    def __init__(self, booking):
+        dates = booking.get('bookingdates') or {}
+        self.firstname = booking.get('firstname')
+        self.lastname = booking.get('lastname')
+        self.checkin = _ordinal(dates.get('checkin'))
+        self.checkout = _ordinal(dates.get('checkout'))
+
+    def matches(self, filters) -> bool:
+        for name, value in filters.items():
+            field = getattr(self, name)
+            if name in DATE_FILTERS:
+                if field is None or field < value:
+                    return False
+            elif field != value:
+                return False
+        return True
+
+
+class BookingIndex:
+    def __init__(self, max_age=QueryIndex.MAX_AGE.value, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.synced_at = None
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._names = {name: {} for name in NAME_FILTERS}
+        self._dates = {name: [] for name in DATE_FILTERS}
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _add(self, booking_id, entry, insert=insort):
+        self._entries[booking_id] = entry
+        for name in NAME_FILTERS:
+            self._names[name].setdefault(getattr(entry, name), set()).add(booking_id)
+        for name in DATE_FILTERS:
+            if getattr(entry, name) is not None:
+                insert(self._dates[name], (getattr(entry, name), booking_id))
+
+    def _remove(self, booking_id):
+        entry = self._entries.pop(booking_id, None)
+        if entry is None:
+            return
+        for name in NAME_FILTERS:
+            ids = self._names[name].get(getattr(entry, name))
+            ids.discard(booking_id)
+            if not ids:
+                del self._names[name][getattr(entry, name)]
+        for name in DATE_FILTERS:
+            if getattr(entry, name) is not None:
+                ordered = self._dates[name]
+                del ordered[bisect_left(ordered, (getattr(entry, name), booking_id))]
+
+    def _apply(self, booking_id, booking):
+        self._remove(booking_id)
+        if booking is not None:
+            self._add(booking_id, _Entry(booking))
+
+    def build(self, bookings, synced_at=None):
+        # bookings is an iterable of (booking_id, booking) pairs describing the whole dataset
+        synced_at = self.clock() if synced_at is None else synced_at
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._entries = {}
+            self._names = {name: {} for name in NAME_FILTERS}
+            self._dates = {name: [] for name in DATE_FILTERS}
+            for booking_id, booking in bookings:
+                self._add(booking_id, _Entry(booking), list.append)
+            for ordered in self._dates.values():
+                ordered.sort()
+            # writes made by the client while the dataset was being fetched win over the fetched copies
+            for booking_id, booking in pending or ():
+                self._apply(booking_id, booking)
+            self.synced_at = synced_at
+        return self
+
+    def refresh(self, client):
+        started = self.clock()
+        with self._lock:
+            self._pending = []
+        bookings = []
+        for result in client.iter_bookings():
+            if result.ok:
+                bookings.append((result.item, result.result))
+            elif not (isinstance(result.error, HTTPError) and result.error.response is not None
+                      and result.error.response.status_code == 404):
+                with self._lock:
+                    self._pending = None
+                raise result.error
+        return self.build(bookings, synced_at=started)
+
+    def put(self, booking_id, booking):
+        with self._lock:
+            self._apply(booking_id, booking)
+            self.writes += 1
+            if self._pending is not None:
+                self._pending.append((booking_id, booking))
+
+    def remove(self, booking_id):
+        self.put(booking_id, None)
+
+    def age(self):
+        return None if self.synced_at is None else self.clock() - self.synced_at
+
+    @property
+    def stale(self) -> bool:
+        age = self.age()
+        return age is None or age > self.max_age
+
+    def _candidates(self, filters):
+        names = [self._names[name].get(filters[name], set()) for name in NAME_FILTERS if name in filters]
+        if names:
+            return min(names, key=len)
+        ranges = []
+        for name in DATE_FILTERS:
+            if name in filters:
+                ordered = self._dates[name]
+                ranges.append(ordered[bisect_left(ordered, (filters[name],)):])
+        return [booking_id for _, booking_id in min(ranges, key=len)] if ranges else self._entries
+
+    def query(self, params=None, date_filters=True):
+        # date filters follow the local server: checkin and checkout match bookings on or after the given day
+        filters = {}
+        for name, value in dict(params or {}).items():
+            if name in NAME_FILTERS:
+                filters[name] = str(value)
+            elif name in DATE_FILTERS and date_filters and _ordinal(value) is not None:
+                filters[name] = _ordinal(value)
+            else:
+                return None
+        with self._lock:
+            if self.stale:
+                self.misses += 1
+                return None
+            found = sorted(booking_id for booking_id in self._candidates(filters) if self._entries[booking_id].matches(filters))
+            self.hits += 1
+        return [{'bookingid': booking_id} for booking_id in found]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'age': self.age(),
+                'max_age': self.max_age,
+                'stale': self.stale,
+                'writes': self.writes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
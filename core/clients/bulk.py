@@ -0,0 +1,37 @@
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+@dataclass
+class BulkResult:
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_bulk(func: Callable, items: Iterable, max_workers: int, window: int = None) -> Iterator[BulkResult]:
+    window = window or max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bulk') as executor:
+        pending = deque()
+        for index, item in enumerate(items):
+            # each task runs in a copy of the caller's context, so its steps nest under the caller's step
+            pending.append((index, item, executor.submit(contextvars.copy_context().run, func, item)))
+            if len(pending) >= window:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+
+
+def _collect(index, item, future) -> BulkResult:
+    try:
+        return BulkResult(index, item, result=future.result())
+    except Exception as e:
+        return BulkResult(index, item, error=e)
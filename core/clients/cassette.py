@@ -0,0 +1,225 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+from core.clients import codec
+from core.clients.token_cache import _file_lock
+from core.data.namespace import run_id, run_tag
+from core.settings.config import CassetteMode
+
+
+CASSETTE_VERSION = 3
+DATE_PATTERN = re.compile(r'\b\d{4}-\d{2}-\d{2}\b')
+PLACEHOLDER_PATTERN = re.compile(r'<(tag|run)>|<date([+-]\d+)>')
+# headers the clients act on; Date, Server and the like would only keep identical responses apart
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Retry-After')
+
+
+class CassetteMissError(ConnectionError):
+    pass
+
+
+class Cassette:
+    def __init__(self, path, mode=CassetteMode.REPLAY, today=None):
+        self.path = path
+        self.mode = CassetteMode(getattr(mode, 'value', mode))
+        self.today = today or date.today()
+        self.scope = None
+        self.meta = {}
+        self._responses = []
+        self._response_ids = {}
+        self._index = {}
+        self._recorded = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        if self.mode is not CassetteMode.RECORD:
+            self.load()
+
+    @classmethod
+    def from_env(cls):
+        path = os.getenv('CASSETTE_PATH')
+        if not path:
+            return None
+        return cls(path, os.getenv('CASSETTE_MODE') or CassetteMode.REPLAY.value)
+
+    def __len__(self):
+        return sum(len(responses) for responses in self._index.values())
+
+    def load(self):
+        try:
+            with gzip.open(self.path, 'rb') as file:
+                document = codec.loads(file.read())
+        except FileNotFoundError:
+            if self.mode is CassetteMode.STRICT:
+                raise
+            return self
+        if document.get('version') != CASSETTE_VERSION:
+            raise ValueError(f'Unsupported cassette version: {document.get("version")}')
+        self.meta = document['meta']
+        self._responses = [(status, tuple(map(tuple, headers)), content) for status, headers, content in document['responses']]
+        self._response_ids = {response: index for index, response in enumerate(self._responses)}
+        self._index = document['index']
+        return self
+
+    def save(self):
+        if not self._recorded:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, _file_lock(self.path + '.lock'):
+            # other workers may have saved their part of the recording meanwhile
+            stored = Cassette(self.path, CassetteMode.REPLAY, self.today)
+            responses = list(stored._responses)
+            response_ids = dict(stored._response_ids)
+            index = {key: list(entries) for key, entries in stored._index.items()}
+            for key, entries in self._recorded.items():
+                index[key] = []
+                for response in entries:
+                    if response not in response_ids:
+                        response_ids[response] = len(responses)
+                        responses.append(response)
+                    index[key].append(response_ids[response])
+            document = {'version': CASSETTE_VERSION, 'meta': dict(stored.meta, **self.meta), 'responses': responses, 'index': index}
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.cassette-')
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as file:
+                file.write(codec.dumps(document))
+            os.replace(temp_path, self.path)
+
+    def pin_seed(self, seed):
+        if self.mode is CassetteMode.RECORD:
+            self.meta['seed'] = seed
+            return seed
+        return self.meta.get('seed', seed)
+
+    def normalize(self, text):
+        text = text.replace(run_tag(), '<tag>').replace(run_id(), '<run>')
+        return DATE_PATTERN.sub(self._date_placeholder, text)
+
+    def _date_placeholder(self, match):
+        try:
+            day = date.fromisoformat(match.group())
+        except ValueError:
+            return match.group()
+        return f'<date{(day - self.today).days:+d}>'
+
+    def denormalize(self, text):
+        return PLACEHOLDER_PATTERN.sub(self._placeholder_value, text)
+
+    def _placeholder_value(self, match):
+        if match.group(1) is not None:
+            return run_tag() if match.group(1) == 'tag' else run_id()
+        return (self.today + timedelta(days=int(match.group(2)))).isoformat()
+
+    def key(self, request) -> str:
+        url = urlsplit(request.url)
+        target = url.path
+        if url.query:
+            target += '?' + urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode()
+        text = body.decode('utf-8', 'surrogateescape')
+        try:
+            text = json.dumps(json.loads(text), sort_keys=True, separators=(',', ':')) if text else text
+        except ValueError:
+            pass
+        digest = hashlib.blake2b(self.normalize(text).encode('utf-8', 'surrogateescape'), digest_size=8).hexdigest() if text else '-'
+        return f'{request.method} {self.normalize(target)} {_auth_state(request.headers)} {digest}'
+
+    def keys(self, request) -> list:
+        key = self.key(request)
+        # interactions inside a test are matched within that test first, so replay does not depend on test order
+        return [f'{self.scope} {key}', key] if self.scope else [key]
+
+    def play(self, keys):
+        with self._lock:
+            for key in keys:
+                entries = self._index.get(key)
+                if entries:
+                    position = self._positions.get(key, 0)
+                    # repeated identical requests get the recorded responses in order, then the last one
+                    self._positions[key] = position + 1
+                    return self._responses[entries[min(position, len(entries) - 1)]]
+            return None
+
+    def record(self, keys, response):
+        content = self.normalize(response.content.decode('utf-8', 'surrogateescape'))
+        headers = tuple((name, response.headers[name]) for name in RECORDED_HEADERS if name in response.headers)
+        recorded = (response.status_code, headers, content)
+        with self._lock:
+            for key in keys:
+                self._recorded.setdefault(key, []).append(recorded)
+
+    def build_response(self, request, recorded) -> requests.Response:
+        status, headers, content = recorded
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'Replayed'
+        response.headers = CaseInsensitiveDict(dict(headers))
+        response._content = self.denormalize(content).encode('utf-8', 'surrogateescape')
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def mount(self, session):
+        adapter = CassetteAdapter(self, session.get_adapter('http://'))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+
+def _auth_state(headers) -> str:
+    # only credentials sent with the request itself count; the Bearer header the client keeps on its
+    # session appears after the first write of a run, which would make keys depend on test order
+    if 'token=' in headers.get('Cookie', ''):
+        return 'cookie'
+    if headers.get('Authorization', '').startswith('Basic '):
+        return 'basic'
+    return 'anonymous'
+
+
+class CassetteAdapter(BaseAdapter):
+    def __init__(self, cassette, adapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        keys = self.cassette.keys(request)
+        if self.cassette.mode is not CassetteMode.RECORD:
+            recorded = self.cassette.play(keys)
+            if recorded is not None:
+                return self.cassette.build_response(request, recorded)
+            if self.cassette.mode is CassetteMode.STRICT:
+                raise CassetteMissError(f'No recorded interaction for {keys[0]}', request=request)
+        response = self.adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        self.cassette.record(keys, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+_active = {}
+
+
+def active_cassette():
+    path = os.getenv('CASSETTE_PATH')
+    if not path:
+        return None
+    if path not in _active:
+        _active[path] = Cassette.from_env()
+    return _active[path]
@@ -0,0 +1,27 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson turns integers beyond 64 bits into floats, so payloads with such long digit runs are parsed exactly by json
+LONG_NUMBER = re.compile(rb'\d{20,}')
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # orjson rejects integers outside 64 bits, the standard library does not
+            pass
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def loads(raw):
+    encoded = raw.encode() if isinstance(raw, str) else raw
+    if orjson is not None and LONG_NUMBER.search(encoded) is None:
+        return orjson.loads(encoded)
+    return json.loads(encoded)
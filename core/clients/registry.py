@@ -0,0 +1,56 @@
+import threading
+import time
+
+from requests import HTTPError
+
+from core.settings.config import Teardown
+
+
+GONE_STATUSES = (404, 405)
+
+
+class BookingRegistry:
+    def __init__(self, name='session'):
+        self.name = name
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
+
+    def __contains__(self, booking_id):
+        with self._lock:
+            return booking_id in self._ids
+
+    def record(self, booking_id):
+        with self._lock:
+            self._ids[booking_id] = None
+
+    def forget(self, booking_id):
+        with self._lock:
+            self._ids.pop(booking_id, None)
+
+    def ids(self) -> list:
+        with self._lock:
+            return list(self._ids)
+
+    def teardown(self, client, retries=Teardown.RETRIES.value, backoff=Teardown.BACKOFF.value, max_workers=None) -> list:
+        pending = self.ids()
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            failed = []
+            for result in client.delete_bookings_bulk(pending, max_workers=max_workers):
+                if result.ok or _already_gone(result.error):
+                    self.forget(result.item)
+                else:
+                    failed.append(result.item)
+            pending = failed
+        return pending
+
+
+def _already_gone(error) -> bool:
+    return isinstance(error, HTTPError) and error.response is not None and error.response.status_code in GONE_STATUSES
@@ -0,0 +1,90 @@
+import copy
+import threading
+from contextlib import contextmanager
+
+
+IDS_SCOPE = 'ids'
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'followers', 'scopes')
+
+    def __init__(self, scopes=()):
+        self.scopes = scopes
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._epochs = {}
+        self._barriers = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _key(self, key, scopes):
+        return key, tuple(self._epochs.get(scope, 0) for scope in scopes)
+
+    def do(self, key, func, scopes=()):
+        with self._lock:
+            key = self._key(key, scopes)
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(scopes)
+                self.leaders += 1
+            else:
+                call.followers += 1
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            # followers get their own copy so callers cannot mutate each other's results
+            return copy.deepcopy(call.result)
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                self._prune(call.scopes)
+                followers = call.followers
+            # with followers the shared result stays untouched, the leader gets a copy as well
+            result = copy.deepcopy(call.result) if followers else call.result
+            call.event.set()
+        return result
+
+    def _prune(self, scopes):
+        # drop idle scopes so long-lived clients do not keep an epoch for every booking ever written
+        for scope in scopes:
+            if scope in self._epochs and not self._barriers.get(scope) and not any(scope in call.scopes for call in self._calls.values()):
+                del self._epochs[scope]
+                self._barriers.pop(scope, None)
+
+    def _advance(self, scopes, entering):
+        with self._lock:
+            for scope in scopes:
+                self._epochs[scope] = self._epochs.get(scope, 0) + 1
+                self._barriers[scope] = self._barriers.get(scope, 0) + (1 if entering else -1)
+            self._prune(scopes)
+
+    @contextmanager
+    def barrier(self, *scopes):
+        # reads started before or during a write never share a request with reads started after it
+        self._advance(scopes, entering=True)
+        try:
+            yield
+        finally:
+            self._advance(scopes, entering=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'requests': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
@@ -0,0 +1,51 @@
+import codecs
+import json
+
+
+WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(chunks):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = finished = False
+    chunks = iter(chunks)
+    exhausted = False
+    while not finished:
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b'', final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError(f'Expected a JSON array, got {buffer[position]!r}')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ',':
+                position += 1
+                continue
+            if buffer[position] == ']':
+                finished = True
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            if end == len(buffer) and not exhausted:
+                # a scalar may continue in the next chunk
+                break
+            position = end
+            yield item
+        buffer = buffer[position:]
+        if exhausted and not finished:
+            raise ValueError('Unexpected end of JSON array')
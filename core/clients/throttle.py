@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from core.clients.endpoints import Endpoints
+from core.clients.transport import resolve_endpoint
+from core.settings.config import RateLimits, Throttling
+from core.settings.environment import env_statuses, env_value
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=Throttling.BURST.value, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1) -> float:
+        # takes the tokens now and returns how long the caller has to wait before using them
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class AdaptiveLimiter:
+    def __init__(self, rate=0, burst=Throttling.BURST.value, initial=Throttling.INITIAL_CONCURRENCY.value,
+                 minimum=Throttling.MIN_CONCURRENCY.value, maximum=Throttling.MAX_CONCURRENCY.value,
+                 increase=Throttling.INCREASE.value, decrease=Throttling.DECREASE.value,
+                 latency_factor=Throttling.LATENCY_FACTOR.value, backoff_statuses=Throttling.BACKOFF_STATUSES.value,
+                 clock=time.monotonic, bucket: TokenBucket = None):
+        self.bucket = bucket if bucket is not None else TokenBucket(rate, burst, clock)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.backoff_statuses = frozenset(backoff_statuses)
+        self.clock = clock
+        self.window = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.latency = None
+        self.completed = 0
+        self.backoffs = 0
+        self.last_backoff = None
+        self._condition = threading.Condition()
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def _try_enter(self) -> bool:
+        if self.in_flight >= int(self.window):
+            return False
+        self.in_flight += 1
+        return True
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(self._try_enter)
+        wait = self.bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return self.clock()
+
+    async def acquire_async(self, poll=0.005):
+        while True:
+            with self._condition:
+                if self._try_enter():
+                    break
+            await asyncio.sleep(poll)
+        wait = self.bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self.clock()
+
+    def release(self, started, status=None, error=False, retry_after=None):
+        latency = self.clock() - started
+        with self._condition:
+            self.in_flight -= 1
+            self.completed += 1
+            spike = self.latency is not None and latency > self.latency_factor * self.latency
+            if not error and status not in self.backoff_statuses:
+                # spikes are folded in too, so a lasting shift in latency becomes the new baseline
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if error or status in self.backoff_statuses or spike:
+                self._back_off()
+            else:
+                # one additional slot per window of successful calls
+                self.window = min(self.maximum, self.window + self.increase / self.window)
+            self._condition.notify_all()
+        if retry_after:
+            self.bucket.pause(retry_after)
+
+    def _back_off(self):
+        now = self.clock()
+        # calls already in flight when the first failure arrived must not shrink the window again
+        if self.last_backoff is not None and now - self.last_backoff < (self.latency or 0.0):
+            return
+        self.last_backoff = now
+        self.backoffs += 1
+        self.window = max(self.minimum, self.window * self.decrease)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'rate': self.rate,
+                'window': round(self.window, 2),
+                'in_flight': self.in_flight,
+                'latency': self.latency,
+                'completed': self.completed,
+                'backoffs': self.backoffs,
+            }
+
+
+@dataclass(frozen=True)
+class ThrottlePolicy:
+    rates: dict = field(default_factory=lambda: {endpoint: 0.0 for endpoint in Endpoints})
+    burst: int = Throttling.BURST.value
+    initial_concurrency: int = Throttling.INITIAL_CONCURRENCY.value
+    min_concurrency: int = Throttling.MIN_CONCURRENCY.value
+    max_concurrency: int = Throttling.MAX_CONCURRENCY.value
+    increase: float = Throttling.INCREASE.value
+    decrease: float = Throttling.DECREASE.value
+    latency_factor: float = Throttling.LATENCY_FACTOR.value
+    backoff_statuses: tuple = Throttling.BACKOFF_STATUSES.value
+    enabled: bool = False
+
+    @classmethod
+    def from_env(cls, environment):
+        rate = env_value('HTTP_RATE', RateLimits[environment.name].value, float)
+        rates = {endpoint: env_value(f'HTTP_{endpoint.name}_RATE', rate, float) for endpoint in Endpoints}
+        return cls(
+            rates=rates,
+            burst=env_value('HTTP_BURST', Throttling.BURST.value, int),
+            initial_concurrency=env_value('HTTP_INITIAL_CONCURRENCY', Throttling.INITIAL_CONCURRENCY.value, int),
+            min_concurrency=env_value('HTTP_MIN_CONCURRENCY', Throttling.MIN_CONCURRENCY.value, int),
+            max_concurrency=env_value('HTTP_MAX_CONCURRENCY', Throttling.MAX_CONCURRENCY.value, int),
+            increase=env_value('HTTP_CONCURRENCY_INCREASE', Throttling.INCREASE.value, float),
+            decrease=env_value('HTTP_CONCURRENCY_DECREASE', Throttling.DECREASE.value, float),
+            latency_factor=env_value('HTTP_LATENCY_FACTOR', Throttling.LATENCY_FACTOR.value, float),
+            backoff_statuses=env_statuses('HTTP_BACKOFF_STATUSES', Throttling.BACKOFF_STATUSES.value),
+            enabled=env_value('HTTP_THROTTLE', any(value > 0 for value in rates.values()), bool),
+        )
+
+    def build_limiter(self, endpoint, bucket: TokenBucket = None) -> AdaptiveLimiter:
+        return AdaptiveLimiter(self.rates[endpoint], self.burst, self.initial_concurrency, self.min_concurrency,
+                               self.max_concurrency, self.increase, self.decrease, self.latency_factor, self.backoff_statuses,
+                               bucket=bucket)
+
+
+def route_of(endpoint, path=None) -> str:
+    # a lookup by id and a filtered list on the same endpoint have very different latencies;
+    # path is relative to the base url, so a prefix such as /api is not mistaken for an id
+    endpoint = resolve_endpoint(endpoint)
+    segments = [segment for segment in urlsplit(str(path or '')).path.split('/') if segment]
+    return f'{endpoint.name}/{{id}}' if len(segments) > 1 else endpoint.name
+
+
+class Throttle:
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, policy: ThrottlePolicy):
+        self.policy = policy
+        # routes of one endpoint keep their own window but share its rate
+        self.buckets = {endpoint: TokenBucket(policy.rates[endpoint], policy.burst) for endpoint in Endpoints}
+        self.limiters = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, environment):
+        policy = ThrottlePolicy.from_env(environment)
+        if not policy.enabled:
+            return None
+        with cls._shared_lock:
+            if environment not in cls._shared:
+                cls._shared[environment] = cls(policy)
+            return cls._shared[environment]
+
+    def limiter(self, endpoint, path=None) -> AdaptiveLimiter:
+        endpoint = resolve_endpoint(endpoint)
+        route = route_of(endpoint, path)
+        with self._lock:
+            if route not in self.limiters:
+                self.limiters[route] = self.policy.build_limiter(endpoint, self.buckets[endpoint])
+            return self.limiters[route]
+
+    def stats(self) -> dict:
+        with self._lock:
+            limiters = dict(self.limiters)
+        return {route: limiter.stats() for route, limiter in limiters.items()}
+
+
+def retry_after(headers) -> float:
+    value = headers.get('Retry-After') if headers is not None else None
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        # HTTP-date values are left to the transport retry
+        return 0.0
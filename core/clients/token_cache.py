@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from core.settings.config import TokenCacheSettings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TokenCache:
+    def __init__(self, path=None, ttl=None, clock=time.time):
+        self.path = path or os.getenv('TOKEN_CACHE_PATH') or os.path.join(tempfile.gettempdir(), TokenCacheSettings.FILE_NAME.value)
+        self.ttl = ttl if ttl is not None else float(os.getenv('TOKEN_CACHE_TTL') or TokenCacheSettings.TTL.value)
+        self.clock = clock
+        self.lock_path = self.path + '.lock'
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(environment, base_url, username) -> str:
+        environment = getattr(environment, 'value', environment)
+        return f'{environment}|{base_url}|{username}'
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        now = self.clock()
+        entries = {key: entry for key, entry in entries.items() if entry['expires_at'] > now}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tokens-')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(entries, file)
+        os.replace(temp_path, self.path)
+
+    def _valid(self, entry):
+        return entry is not None and entry['expires_at'] > self.clock()
+
+    def get(self, key):
+        entry = self._read().get(key)
+        return entry['token'] if self._valid(entry) else None
+
+    def put(self, key, token):
+        with self._lock, _file_lock(self.lock_path):
+            entries = self._read()
+            entries[key] = {'token': token, 'expires_at': self.clock() + self.ttl}
+            self._write(entries)
+
+    def invalidate(self, key, token=None):
+        with self._lock, _file_lock(self.lock_path):
+            entries = self._read()
+            entry = entries.get(key)
+            if entry is None or (token is not None and entry['token'] != token):
+                return False
+            del entries[key]
+            self._write(entries)
+            return True
+
+    def get_or_fetch(self, key, fetch):
+        token = self.get(key)
+        if token is not None:
+            return token
+        with self._lock, _file_lock(self.lock_path):
+            entries = self._read()
+            entry = entries.get(key)
+            if self._valid(entry):
+                return entry['token']
+            token = fetch()
+            if token is None:
+                return None
+            entries[key] = {'token': token, 'expires_at': self.clock() + self.ttl}
+            self._write(entries)
+            return token
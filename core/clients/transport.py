@@ -0,0 +1,158 @@
+import threading
+import time
+from dataclasses import dataclass, field
+
+from requests.exceptions import ConnectionError
+from urllib3.util.retry import Retry
+
+from core.clients.endpoints import Endpoints
+from core.metrics.instrumentation import InstrumentedAdapter
+from core.settings.config import Timeouts, EndpointTimeouts, Pool, Retries, CircuitBreakerSettings, Concurrency
+from core.settings.environment import env_statuses, env_value
+
+
+def resolve_endpoint(endpoint) -> Endpoints:
+    if isinstance(endpoint, Endpoints):
+        return endpoint
+    path = '/' + str(endpoint).lstrip('/').split('?')[0].split('/')[0]
+    for member in Endpoints:
+        if member.value == path:
+            return member
+    raise ValueError(f'Unsupported endpoint: {endpoint}')
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+@dataclass(frozen=True)
+class TransportPolicy:
+    pool_connections: int = Pool.POOL_CONNECTIONS.value
+    pool_maxsize: int = Pool.POOL_MAXSIZE.value
+    pool_block: bool = Pool.POOL_BLOCK.value
+    keep_alive: bool = Pool.KEEP_ALIVE.value
+    connect_timeout: float = Timeouts.CONNECT_TIMEOUT.value
+    read_timeouts: dict = field(default_factory=lambda: {endpoint: EndpointTimeouts[endpoint.name].value for endpoint in Endpoints})
+    retries: int = Retries.TOTAL.value
+    backoff_factor: float = Retries.BACKOFF_FACTOR.value
+    backoff_jitter: float = Retries.BACKOFF_JITTER.value
+    backoff_max: float = Retries.BACKOFF_MAX.value
+    retry_statuses: tuple = Retries.STATUS_FORCELIST.value
+    failure_threshold: int = CircuitBreakerSettings.FAILURE_THRESHOLD.value
+    reset_timeout: float = CircuitBreakerSettings.RESET_TIMEOUT.value
+    failure_statuses: tuple = CircuitBreakerSettings.FAILURE_STATUSES.value
+    bulk_workers: int = Concurrency.BULK_WORKERS.value
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            pool_connections=env_value('HTTP_POOL_CONNECTIONS', Pool.POOL_CONNECTIONS.value, int),
+            pool_maxsize=env_value('HTTP_POOL_MAXSIZE', Pool.POOL_MAXSIZE.value, int),
+            pool_block=env_value('HTTP_POOL_BLOCK', Pool.POOL_BLOCK.value, bool),
+            keep_alive=env_value('HTTP_KEEP_ALIVE', Pool.KEEP_ALIVE.value, bool),
+            connect_timeout=env_value('HTTP_CONNECT_TIMEOUT', Timeouts.CONNECT_TIMEOUT.value, float),
+            read_timeouts={
+                endpoint: env_value(f'HTTP_{endpoint.name}_READ_TIMEOUT', EndpointTimeouts[endpoint.name].value, float)
+                for endpoint in Endpoints
+            },
+            retries=env_value('HTTP_RETRIES', Retries.TOTAL.value, int),
+            backoff_factor=env_value('HTTP_BACKOFF_FACTOR', Retries.BACKOFF_FACTOR.value, float),
+            backoff_jitter=env_value('HTTP_BACKOFF_JITTER', Retries.BACKOFF_JITTER.value, float),
+            backoff_max=env_value('HTTP_BACKOFF_MAX', Retries.BACKOFF_MAX.value, float),
+            retry_statuses=env_statuses('HTTP_RETRY_STATUSES', Retries.STATUS_FORCELIST.value),
+            failure_threshold=env_value('HTTP_CIRCUIT_FAILURE_THRESHOLD', CircuitBreakerSettings.FAILURE_THRESHOLD.value, int),
+            reset_timeout=env_value('HTTP_CIRCUIT_RESET_TIMEOUT', CircuitBreakerSettings.RESET_TIMEOUT.value, float),
+            failure_statuses=env_statuses('HTTP_CIRCUIT_FAILURE_STATUSES', CircuitBreakerSettings.FAILURE_STATUSES.value),
+            bulk_workers=env_value('HTTP_BULK_WORKERS', Concurrency.BULK_WORKERS.value, int),
+        )
+
+    def timeout_for(self, endpoint):
+        return self.connect_timeout, self.read_timeouts[resolve_endpoint(endpoint)]
+
+    def workers_for(self, max_workers=None):
+        # more workers than pooled connections would only open and discard extra sockets
+        return max(1, min(max_workers or self.bulk_workers, self.pool_maxsize))
+
+    def build_retry(self) -> Retry:
+        return Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            status_forcelist=self.retry_statuses,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            backoff_max=self.backoff_max,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+    def build_adapter(self) -> InstrumentedAdapter:
+        return InstrumentedAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.build_retry(),
+            pool_block=self.pool_block,
+        )
+
+    def mount(self, session):
+        adapter = self.build_adapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers.update({'Connection': 'close'})
+        return session
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout, failure_statuses=()):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_statuses = frozenset(failure_statuses)
+        self.failures = 0
+        self.opened_at = None
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        with self._lock:
+            if self._state == self.CLOSED or self.failure_threshold <= 0:
+                return
+            if self._state == self.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_timeout:
+                    raise CircuitOpenError(f'Circuit breaker is open after {self.failures} failures, retry in {self.reset_timeout - elapsed:.1f}s')
+                self._state = self.HALF_OPEN
+                return
+            raise CircuitOpenError('Circuit breaker is half-open, waiting for the probe request')
+
+    def record_response(self, status_code):
+        if status_code in self.failure_statuses:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or (0 < self.failure_threshold <= self.failures):
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
@@ -0,0 +1,102 @@
+import random
+from datetime import date, timedelta
+
+from core.settings.config import BookingData
+
+
+EDGE_CASES = {
+    'zero_price': lambda booking: booking.update(totalprice=0),
+    'huge_price': lambda booking: booking.update(totalprice=10**10),
+    'same_day': lambda booking: booking['bookingdates'].update(checkin=booking['bookingdates']['checkout']),
+    'special_characters': lambda booking: booking.update(firstname='=!@#$%^&*()_+'),
+    'without_additionalneeds': lambda booking: booking.pop('additionalneeds', None),
+}
+
+
+def _edge_case(name):
+    try:
+        return EDGE_CASES[name]
+    except KeyError:
+        raise ValueError(f'Unsupported edge case: {name}')
+
+
+class BookingFactory:
+    def __init__(self, seed=None, batch_size=BookingData.BATCH_SIZE.value, pool_size=BookingData.POOL_SIZE.value,
+                 locale=BookingData.LOCALE.value, start_date=None):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.locale = locale
+        self.start_date = start_date or date.today()
+        self._rng = random.Random(self.seed)
+        self._pools = None
+        self._buffer = []
+
+    def _load_pools(self):
+        if self._pools is None:
+            from faker import Faker
+
+            faker = Faker(self.locale)
+            faker.seed_instance(self.seed)
+            self._pools = {
+                'firstname': [faker.first_name() for _ in range(self.pool_size)],
+                'lastname': [faker.last_name() for _ in range(self.pool_size)],
+                'additionalneeds': [faker.sentence() for _ in range(self.pool_size)],
+                'dates': [(self.start_date + timedelta(days=offset)).isoformat() for offset in range(BookingData.DATE_RANGE_DAYS.value + BookingData.MAX_STAY_DAYS.value + 1)],
+            }
+        return self._pools
+
+    def reseed(self, key):
+        # pools stay shared, only the choices made from them start over for this key
+        self._rng = random.Random(f'{self.seed}:{key}')
+        self._buffer = []
+        return self
+
+    def warm_up(self):
+        self._load_pools()
+        return self
+
+    def batch(self, size=None) -> list:
+        size = size or self.batch_size
+        pools = self._load_pools()
+        rng = self._rng
+        firstnames = rng.choices(pools['firstname'], k=size)
+        lastnames = rng.choices(pools['lastname'], k=size)
+        needs = rng.choices(pools['additionalneeds'], k=size)
+        dates = pools['dates']
+        max_price, date_range, max_stay = BookingData.MAX_PRICE.value, BookingData.DATE_RANGE_DAYS.value, BookingData.MAX_STAY_DAYS.value
+        bookings = []
+        for index in range(size):
+            checkin = rng.randint(1, date_range)
+            bookings.append({
+                'firstname': firstnames[index],
+                'lastname': lastnames[index],
+                'totalprice': rng.randint(0, max_price),
+                'depositpaid': bool(rng.getrandbits(1)),
+                'bookingdates': {
+                    'checkin': dates[checkin],
+                    'checkout': dates[checkin + rng.randint(1, max_stay)]
+                },
+                'additionalneeds': needs[index]
+            })
+        return bookings
+
+    def booking(self, edge_case=None) -> dict:
+        if not self._buffer:
+            self._buffer = self.batch()
+            self._buffer.reverse()
+        booking = self._buffer.pop()
+        if edge_case is not None:
+            _edge_case(edge_case)(booking)
+        return booking
+
+    def stream(self, count=None, edge_case=None):
+        mutate = _edge_case(edge_case) if edge_case is not None else None
+        produced = 0
+        while count is None or produced < count:
+            size = self.batch_size if count is None else min(self.batch_size, count - produced)
+            for booking in self.batch(size):
+                if mutate is not None:
+                    mutate(booking)
+                yield booking
+            produced += size
@@ -0,0 +1,37 @@
+import os
+import re
+import secrets
+from datetime import datetime, timezone
+
+
+TAG_PREFIX = 'ddbrun'
+TAG_PATTERN = re.compile(rf'{TAG_PREFIX}-(?P<started>\d{{14}})(?P<nonce>[0-9a-f]{{4}})-(?P<worker>\w+)')
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S') + secrets.token_hex(2)
+
+def run_id() -> str:
+    if not os.getenv('TEST_RUN_ID'):
+        os.environ['TEST_RUN_ID'] = new_run_id()
+    return os.environ['TEST_RUN_ID']
+
+def worker_name() -> str:
+    return os.getenv('PYTEST_XDIST_WORKER') or 'main'
+
+def run_tag(worker=None) -> str:
+    return f'{TAG_PREFIX}-{run_id()}-{worker or worker_name()}'
+
+def parse_run_tag(value):
+    match = TAG_PATTERN.search(value or '')
+    if match is None:
+        return None
+    started = datetime.strptime(match.group('started'), '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc)
+    return {
+        'run_id': match.group('started') + match.group('nonce'),
+        'started': started,
+        'worker': match.group('worker'),
+    }
+
+def namespaced(booking_data: dict, tag=None) -> dict:
+    return dict(booking_data, lastname=f"{booking_data['lastname']}-{tag or run_tag()}")
@@ -0,0 +1,274 @@
+import json
+import mmap
+import os
+import statistics
+import sys
+from array import array
+from collections import Counter
+from datetime import date
+
+from core.settings.config import Snapshot
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+COLUMNS = {
+    'bookingid': 'q',
+    'totalprice': 'q',
+    'depositpaid': 'b',
+    'checkin': 'i',
+    'checkout': 'i',
+    'firstname': 'i',
+    'lastname': 'i',
+    'additionalneeds': 'i',
+}
+DICTIONARY_COLUMNS = ('firstname', 'lastname', 'additionalneeds')
+NUMPY_TYPES = {'q': 'int64', 'b': 'int8', 'i': 'int32'}
+NULL = {'bookingid': None, 'totalprice': -2**63, 'depositpaid': -1, 'checkin': 0, 'checkout': 0,
+        'firstname': -1, 'lastname': -1, 'additionalneeds': -1}
+META_FILE = 'meta.json'
+ETAGS_FILE = 'etags.json'
+
+
+def _ordinal(value) -> int:
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return NULL['checkin']
+
+def _integer(value, null) -> int:
+    if isinstance(value, bool) or value is None:
+        return null
+    try:
+        value = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return null
+    # the column is 64-bit, prices beyond it are stored like unparseable ones
+    return value if -2**63 < value < 2**63 else null
+
+
+class BookingSnapshot:
+    def __init__(self, columns=None, dictionaries=None, etags=None, meta=None, buffers=()):
+        self.columns = columns or {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.dictionaries = dictionaries or {name: [] for name in DICTIONARY_COLUMNS}
+        self.etags = etags or {}
+        self.meta = meta or {}
+        self._codes = {name: {value: code for code, value in enumerate(values)} for name, values in self.dictionaries.items()}
+        self._buffers = list(buffers)
+        self._index = None
+
+    def __len__(self):
+        return len(self.columns['bookingid'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        with open(os.path.join(path, META_FILE)) as file:
+            meta = json.load(file)
+        if meta.get('version') != Snapshot.VERSION.value:
+            raise ValueError(f'Unsupported snapshot version: {meta.get("version")}')
+        try:
+            with open(os.path.join(path, ETAGS_FILE)) as file:
+                etags = {int(booking_id): etag for booking_id, etag in json.load(file).items()}
+        except FileNotFoundError:
+            etags = {}
+        swap = meta['byteorder'] != sys.byteorder
+        columns, buffers = {}, []
+        for name, typecode in COLUMNS.items():
+            column_path = os.path.join(path, f'{name}.bin')
+            if use_mmap and not swap and os.path.getsize(column_path):
+                with open(column_path, 'rb') as file:
+                    buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                buffers.append(buffer)
+                columns[name] = memoryview(buffer).cast(typecode)
+            else:
+                values = array(typecode)
+                with open(column_path, 'rb') as file:
+                    values.frombytes(file.read())
+                if swap:
+                    values.byteswap()
+                columns[name] = values
+            if len(columns[name]) != meta['rows']:
+                raise ValueError(f'Column {name} has {len(columns[name])} rows, expected {meta["rows"]}')
+        return cls(columns, meta['dictionaries'], etags, meta, buffers)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, typecode in COLUMNS.items():
+            values = self.columns[name]
+            if not isinstance(values, array):
+                values = array(typecode, values)
+            self._replace(path, f'{name}.bin', values.tofile)
+        self._replace(path, ETAGS_FILE, lambda file: file.write(json.dumps(self.etags).encode()))
+        # meta is written last, readers check every column against its row count
+        meta = dict(self.meta, version=Snapshot.VERSION.value, rows=len(self), byteorder=sys.byteorder,
+                    columns=COLUMNS, dictionaries=self.dictionaries)
+        self._replace(path, META_FILE, lambda file: file.write(json.dumps(meta).encode()))
+        self.meta = meta
+        return self
+
+    @staticmethod
+    def _replace(path, name, write):
+        temp_path = os.path.join(path, f'.{name}.tmp')
+        with open(temp_path, 'wb') as file:
+            write(file)
+        os.replace(temp_path, os.path.join(path, name))
+
+    def close(self):
+        for values in self.columns.values():
+            if isinstance(values, memoryview):
+                values.release()
+        for buffer in self._buffers:
+            buffer.close()
+        self._buffers = []
+
+    def _encode(self, name, value):
+        if value is None:
+            return NULL[name]
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.dictionaries[name])
+            self.dictionaries[name].append(value)
+        return code
+
+    def decode(self, name, code):
+        return None if code == NULL[name] else self.dictionaries[name][code]
+
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = {booking_id: row for row, booking_id in enumerate(self.columns['bookingid'])}
+        return self._index
+
+    def row(self, row) -> dict:
+        columns = self.columns
+        checkin, checkout = columns['checkin'][row], columns['checkout'][row]
+        price, deposit = columns['totalprice'][row], columns['depositpaid'][row]
+        return {
+            'bookingid': columns['bookingid'][row],
+            'firstname': self.decode('firstname', columns['firstname'][row]),
+            'lastname': self.decode('lastname', columns['lastname'][row]),
+            'totalprice': None if price == NULL['totalprice'] else price,
+            'depositpaid': None if deposit == NULL['depositpaid'] else bool(deposit),
+            'bookingdates': {
+                'checkin': date.fromordinal(checkin).isoformat() if checkin else None,
+                'checkout': date.fromordinal(checkout).isoformat() if checkout else None,
+            },
+            'additionalneeds': self.decode('additionalneeds', columns['additionalneeds'][row]),
+        }
+
+    def get(self, booking_id):
+        row = self.index().get(booking_id)
+        return None if row is None else self.row(row)
+
+    def _append_booking(self, columns, booking_id, booking):
+        dates = booking.get('bookingdates') or {}
+        columns['bookingid'].append(booking_id)
+        columns['totalprice'].append(_integer(booking.get('totalprice'), NULL['totalprice']))
+        deposit = booking.get('depositpaid')
+        columns['depositpaid'].append(int(deposit) if isinstance(deposit, bool) else NULL['depositpaid'])
+        columns['checkin'].append(_ordinal(dates.get('checkin')))
+        columns['checkout'].append(_ordinal(dates.get('checkout')))
+        for name in DICTIONARY_COLUMNS:
+            columns[name].append(self._encode(name, booking.get(name)))
+
+    def merge(self, keep_ids, changed, etags=None):
+        # unchanged rows are copied column by column, their dictionary codes stay valid as dictionaries only grow
+        columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        merged = BookingSnapshot(columns, {name: list(values) for name, values in self.dictionaries.items()}, meta=dict(self.meta))
+        keep_ids = set(keep_ids)
+        for row, booking_id in enumerate(self.columns['bookingid']):
+            if booking_id not in keep_ids:
+                continue
+            if booking_id in changed:
+                merged._append_booking(columns, booking_id, changed[booking_id])
+                continue
+            for name in COLUMNS:
+                columns[name].append(self.columns[name][row])
+            merged.etags[booking_id] = self.etags.get(booking_id)
+        known = self.index()
+        for booking_id, booking in changed.items():
+            if booking_id not in known and booking_id in keep_ids:
+                merged._append_booking(columns, booking_id, booking)
+        merged.etags.update({booking_id: etag for booking_id, etag in (etags or {}).items() if booking_id in keep_ids})
+        merged.etags = {booking_id: etag for booking_id, etag in merged.etags.items() if etag}
+        return merged
+
+    @classmethod
+    def from_bookings(cls, bookings, etags=None):
+        bookings = dict(bookings)
+        return cls().merge(bookings, bookings, etags)
+
+    def _vector(self, name):
+        values = self.columns[name]
+        if numpy is not None:
+            return numpy.frombuffer(values, dtype=NUMPY_TYPES[COLUMNS[name]]) if len(values) else numpy.zeros(0, NUMPY_TYPES[COLUMNS[name]])
+        return values
+
+    def _valid(self, name):
+        values = self._vector(name)
+        if numpy is not None:
+            return values[values != NULL[name]]
+        null = NULL[name]
+        return [value for value in values if value != null]
+
+    def price_summary(self, percentiles=(50, 95, 99)) -> dict:
+        prices = self._valid('totalprice')
+        if not len(prices):
+            return {'count': 0}
+        if numpy is not None:
+            summary = {'count': int(prices.size), 'sum': int(prices.sum()), 'min': int(prices.min()),
+                       'mean': float(prices.mean()), 'max': int(prices.max())}
+            summary.update({f'p{percentile}': float(numpy.percentile(prices, percentile)) for percentile in percentiles})
+            return summary
+        ordered = sorted(prices)
+        summary = {'count': len(ordered), 'sum': sum(ordered), 'min': ordered[0], 'mean': statistics.fmean(ordered), 'max': ordered[-1]}
+        summary.update({f'p{percentile}': _percentile(ordered, percentile) for percentile in percentiles})
+        return summary
+
+    def stay_lengths(self) -> dict:
+        checkin, checkout = self._vector('checkin'), self._vector('checkout')
+        if numpy is not None:
+            valid = (checkin != NULL['checkin']) & (checkout != NULL['checkout'])
+            nights, counts = numpy.unique(checkout[valid] - checkin[valid], return_counts=True)
+            return {int(night): int(count) for night, count in zip(nights, counts)}
+        null = NULL['checkin']
+        return dict(sorted(Counter(end - start for start, end in zip(checkin, checkout) if start != null and end != null).items()))
+
+    def deposit_share(self) -> float:
+        deposits = self._valid('depositpaid')
+        return float(sum(deposits) / len(deposits)) if len(deposits) else 0.0
+
+    def top(self, name, count=10) -> list:
+        if name not in DICTIONARY_COLUMNS:
+            raise ValueError(f'Not a dictionary encoded column: {name}')
+        if numpy is not None:
+            codes, counts = numpy.unique(self._valid(name), return_counts=True)
+            totals = Counter({int(code): int(total) for code, total in zip(codes, counts)})
+        else:
+            totals = Counter(self._valid(name))
+        return [(self.dictionaries[name][code], total) for code, total in totals.most_common(count)]
+
+    def summary(self) -> dict:
+        return {
+            'rows': len(self),
+            'price': self.price_summary(),
+            'stay_lengths': self.stay_lengths(),
+            'deposit_share': self.deposit_share(),
+        }
+
+
+def _percentile(ordered, percentile):
+    # linear interpolation, as numpy.percentile does by default
+    position = (len(ordered) - 1) * percentile / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return float(ordered[low] + (ordered[high] - ordered[low]) * (position - low))
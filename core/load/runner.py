@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.clients.api_client import APIClient
+from core.clients.endpoints import Endpoints
+from core.data.booking_factory import BookingFactory
+from core.metrics.histogram import LatencyHistogram
+from core.reporting import steps
+from core.settings.config import Load, ReportingLevel
+
+
+OPERATION_ENDPOINTS = {
+    'ping': Endpoints.PING_ENDPOINT,
+    'auth': Endpoints.AUTH_ENDPOINT,
+    'create_booking': Endpoints.BOOKING_ENDPOINT,
+    'get_booking_by_id': Endpoints.BOOKING_ENDPOINT,
+    'get_bookings_ids': Endpoints.BOOKING_ENDPOINT,
+    'update_booking': Endpoints.BOOKING_ENDPOINT,
+    'partial_update_booking': Endpoints.BOOKING_ENDPOINT,
+    'delete_booking': Endpoints.BOOKING_ENDPOINT,
+}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(','):
+        if not part.strip():
+            continue
+        operation, _, weight = part.partition('=')
+        operation = operation.strip()
+        if operation not in OPERATION_ENDPOINTS:
+            raise ValueError(f'Unsupported operation in mix: {operation}')
+        weights[operation] = float(weight) if weight else 1.0
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError(f'Mix has no positive weights: {mix}')
+    return weights
+
+
+class Scenario:
+    def __init__(self, client: APIClient, mix: dict, seed=None):
+        self.client = client
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.booking_ids = deque(maxlen=10000)
+        self._rng = random.Random(seed)
+        self._factory = BookingFactory(seed=seed).warm_up()
+        self._lock = threading.Lock()
+
+    def pick(self):
+        with self._lock:
+            return self._rng.choices(self.operations, self.weights)[0]
+
+    def payload(self):
+        with self._lock:
+            return self._factory.booking()
+
+    def _booking_id(self, pop=False):
+        with self._lock:
+            if self.booking_ids:
+                return self.booking_ids.popleft() if pop else self.booking_ids[-1]
+        return self.client.create_booking(self.payload())['bookingid']
+
+    def _create(self, booking_data):
+        booking_id = self.client.create_booking(booking_data)['bookingid']
+        with self._lock:
+            self.booking_ids.append(booking_id)
+
+    def prepare(self, operation):
+        if operation == 'ping':
+            return self.client.ping
+        if operation == 'auth':
+            return self.client.auth
+        if operation == 'get_bookings_ids':
+            return self.client.get_bookings_ids
+        if operation == 'create_booking':
+            booking_data = self.payload()
+            return lambda: self._create(booking_data)
+        if operation == 'get_booking_by_id':
+            booking_id = self._booking_id()
+            return lambda: self.client.get_booking_by_id(booking_id)
+        if operation == 'update_booking':
+            booking_id, booking_data = self._booking_id(), self.payload()
+            return lambda: self.client.update_booking(booking_id, booking_data)
+        if operation == 'partial_update_booking':
+            booking_id, booking_data = self._booking_id(), {'firstname': self.payload()['firstname']}
+            return lambda: self.client.partial_update_booking(booking_id, booking_data)
+        if operation == 'delete_booking':
+            booking_id = self._booking_id(pop=True)
+            return lambda: self.client.delete_booking(booking_id)
+        raise ValueError(f'Unsupported operation: {operation}')
+
+
+class LoadStats:
+    def __init__(self):
+        self.histograms = defaultdict(LatencyHistogram)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.setup_errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, operation, latency_us, error=None):
+        with self._lock:
+            histogram = self.histograms[operation]
+            if error is not None:
+                self.errors[operation][type(error).__name__] += 1
+        histogram.record(latency_us)
+
+    def record_setup_error(self, error):
+        with self._lock:
+            self.setup_errors[type(error).__name__] += 1
+
+    def _section(self, histogram, errors, elapsed):
+        error_count = sum(errors.values())
+        return {
+            'count': histogram.count,
+            'errors': error_count,
+            'error_rate': error_count / histogram.count if histogram.count else 0.0,
+            'error_types': dict(errors),
+            'throughput_rps': histogram.count / elapsed if elapsed else 0.0,
+            'latency_ms': histogram.summary(),
+        }
+
+    def report(self, elapsed):
+        operations, endpoints = {}, {}
+        endpoint_histograms = defaultdict(LatencyHistogram)
+        endpoint_errors = defaultdict(lambda: defaultdict(int))
+        total, total_errors = LatencyHistogram(), defaultdict(int)
+        for operation, histogram in sorted(self.histograms.items()):
+            errors = self.errors.get(operation, {})
+            operations[operation] = self._section(histogram, errors, elapsed)
+            endpoint = OPERATION_ENDPOINTS[operation].name
+            endpoint_histograms[endpoint].merge(histogram)
+            total.merge(histogram)
+            for name, count in errors.items():
+                endpoint_errors[endpoint][name] += count
+                total_errors[name] += count
+        for endpoint, histogram in endpoint_histograms.items():
+            endpoints[endpoint] = self._section(histogram, endpoint_errors[endpoint], elapsed)
+        return {
+            'total': self._section(total, total_errors, elapsed),
+            'endpoints': endpoints,
+            'operations': operations,
+        }
+
+
+class LoadRunner:
+    def __init__(self, scenario: Scenario, duration=Load.DURATION.value, warmup=Load.WARMUP.value,
+                 concurrency=Load.CONCURRENCY.value, rps=None):
+        self.scenario = scenario
+        self.duration = duration
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.rps = rps
+        self.stats = LoadStats()
+
+    def _execute(self, operation, measure_from, intended_start=None):
+        try:
+            call = self.scenario.prepare(operation)
+        except Exception as e:
+            self.stats.record_setup_error(e)
+            return
+        started = time.perf_counter()
+        error = None
+        try:
+            call()
+        except Exception as e:
+            error = e
+        finished = time.perf_counter()
+        # open-loop runs measure from the scheduled start to avoid coordinated omission
+        origin = started if intended_start is None else intended_start
+        if origin >= measure_from:
+            self.stats.record(operation, (finished - origin) * 1_000_000, error)
+
+    def _closed_loop(self, measure_from, end):
+        def worker():
+            while time.perf_counter() < end:
+                self._execute(self.scenario.pick(), measure_from)
+
+        threads = [threading.Thread(target=worker, name=f'load-{i}', daemon=True) for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _open_loop(self, measure_from, end):
+        interval = 1.0 / self.rps
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='load') as executor:
+            scheduled = time.perf_counter()
+            while scheduled < end:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._execute, self.scenario.pick(), measure_from, scheduled)
+                scheduled += interval
+
+    def run(self):
+        started_at = datetime.now(timezone.utc)
+        measure_from = time.perf_counter() + self.warmup
+        end = measure_from + self.duration
+        if self.rps:
+            self._open_loop(measure_from, end)
+        else:
+            self._closed_loop(measure_from, end)
+        elapsed = max(time.perf_counter() - measure_from, 1e-9)
+        report = {
+            'started_at': started_at.isoformat(),
+            'config': {
+                'duration': self.duration,
+                'warmup': self.warmup,
+                'concurrency': self.concurrency,
+                'rps': self.rps,
+                'mix': dict(zip(self.scenario.operations, self.scenario.weights)),
+                'base_url': self.scenario.client.base_url,
+            },
+            'elapsed_s': elapsed,
+        }
+        report.update(self.stats.report(elapsed))
+        if self.stats.setup_errors:
+            report['setup_errors'] = dict(self.stats.setup_errors)
+        throttle = getattr(self.scenario.client, 'throttle', None)
+        if throttle is not None:
+            report['throttle'] = throttle.stats()
+        return report
+
+
+def compare(baseline: dict, current: dict, tolerance=0.1) -> list:
+    regressions = []
+    for section in ('endpoints', 'operations'):
+        for name, stats in current.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous:
+                continue
+            for percentile in ('p95', 'p99'):
+                before, after = previous['latency_ms'][percentile], stats['latency_ms'][percentile]
+                if before and after > before * (1 + tolerance):
+                    regressions.append(f'{section}.{name}.{percentile}: {before:.2f}ms -> {after:.2f}ms')
+            if stats['error_rate'] > previous['error_rate'] + tolerance / 10:
+                regressions.append(f"{section}.{name}.error_rate: {previous['error_rate']:.2%} -> {stats['error_rate']:.2%}")
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'endpoint':<24}{'count':>8}{'rps':>10}{'errors':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, stats in rows:
+        latency = stats['latency_ms']
+        lines.append(
+            f"{name:<24}{stats['count']:>8}{stats['throughput_rps']:>10.1f}{stats['error_rate']:>9.2%}"
+            f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}{latency['max']:>9.2f}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a weighted load scenario against the booking API')
+    parser.add_argument('--duration', type=float, default=Load.DURATION.value, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=Load.WARMUP.value, help='unmeasured seconds before the run')
+    parser.add_argument('--concurrency', type=int, default=Load.CONCURRENCY.value, help='worker threads')
+    parser.add_argument('--rps', type=float, default=None, help='target request rate (open loop); omit for closed loop')
+    parser.add_argument('--mix', default=Load.MIX.value, help='operation=weight pairs separated by commas')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--baseline', help='JSON report of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative p95/p99 growth')
+    parser.add_argument('--reporting-level', choices=[level.value for level in ReportingLevel],
+                        default=os.getenv('REPORTING_LEVEL') or ReportingLevel.OFF.value, help='allure step reporting during the run')
+    args = parser.parse_args(argv)
+    steps.set_level(args.reporting_level)
+
+    client = APIClient()
+    client.auth()
+    scenario = Scenario(client, parse_mix(args.mix), seed=args.seed)
+    runner = LoadRunner(scenario, args.duration, args.warmup, args.concurrency, args.rps)
+    try:
+        report = runner.run()
+    finally:
+        # bookings created by the mix are recorded in the client's registry and would otherwise stay behind
+        failed = client.registry.teardown(client)
+        if failed:
+            print(f'Failed to delete {len(failed)} bookings: {failed[:20]}')
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), report, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
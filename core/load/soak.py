@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+from core.clients.api_client import APIClient
+from core.data.booking_factory import BookingFactory
+from core.reporting import steps
+from core.settings.config import Soak, ReportingLevel
+
+
+MB = 1024 * 1024
+METRICS = ('rss', 'traced', 'fds', 'connections')
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+@dataclass
+class ResourceSample:
+    elapsed: float
+    iterations: int
+    rss: int = None
+    traced: int = None
+    fds: int = None
+    connections: int = None
+
+
+@dataclass
+class SoakBudgets:
+    rss: int = Soak.RSS_BUDGET_MB.value * MB
+    traced: int = Soak.TRACED_BUDGET_MB.value * MB
+    fds: int = Soak.FDS_BUDGET.value
+    connections: int = Soak.CONNECTIONS_BUDGET.value
+    error_rate: float = Soak.ERROR_RATE_BUDGET.value
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # peak rather than current size, the best available without procfs
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def open_fds():
+    for path in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+def pooled_connections(session) -> int:
+    count = 0
+    for adapter in session.adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None:
+            continue
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            queue = getattr(pool, 'pool', None)
+            if queue is not None:
+                count += sum(1 for connection in list(queue.queue) if connection is not None)
+    return count
+
+
+def growth(samples, name):
+    points = [(sample.elapsed, getattr(sample, name)) for sample in samples if getattr(sample, name) is not None]
+    if len(points) < 2:
+        return None
+    times, values = zip(*points)
+    if len(points) < 3 or len(set(times)) < 2:
+        return {'growth': values[-1] - values[0], 'per_hour': None, 'rising': values[-1] > values[0]}
+    # the fitted line is less sensitive to a single GC pause or pool refill than last minus first
+    slope = statistics.linear_regression(times, values).slope
+    increases = sum(1 for before, after in zip(values, values[1:]) if after > before)
+    decreases = sum(1 for before, after in zip(values, values[1:]) if after < before)
+    return {
+        'growth': slope * (times[-1] - times[0]),
+        'per_hour': slope * 3600,
+        'rising': slope > 0 and increases > decreases,
+    }
+
+def analyze(samples, budgets: SoakBudgets, errors=0) -> dict:
+    trends, violations = {}, []
+    for name in METRICS:
+        trend = growth(samples, name)
+        trends[name] = trend
+        budget = getattr(budgets, name)
+        if trend is not None and budget is not None and trend['growth'] > budget:
+            violations.append(f"{name} grew by {trend['growth']:.0f} (budget {budget})")
+    iterations = samples[-1].iterations if samples else 0
+    # a lifecycle that keeps failing never allocates what a passing one would, so errors must fail the run too
+    if errors and budgets.error_rate is not None and errors > budgets.error_rate * iterations:
+        violations.append(f'errors in {errors} of {iterations} iterations (budget {budgets.error_rate:.2%})')
+    return {'trends': trends, 'violations': violations}
+
+def top_sites(baseline, current, limit=Soak.TOP_SITES.value) -> list:
+    sites = []
+    for stat in current.compare_to(baseline, 'traceback')[:limit]:
+        if stat.size_diff <= 0:
+            break
+        sites.append({
+            'site': ' <- '.join(f'{frame.filename}:{frame.lineno}' for frame in stat.traceback),
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'size': stat.size,
+        })
+    return sites
+
+
+class SoakRunner:
+    def __init__(self, client: APIClient, duration=Soak.DURATION.value, interval=Soak.INTERVAL.value,
+                 warmup=Soak.WARMUP.value, budgets: SoakBudgets = None, frames=Soak.FRAMES.value, seed=None):
+        self.client = client
+        self.duration = duration
+        self.interval = interval
+        self.warmup = warmup
+        self.budgets = budgets or SoakBudgets()
+        self.frames = frames
+        self.factory = BookingFactory(seed=seed)
+        self.iterations = 0
+        self.errors = Counter()
+
+    def lifecycle(self):
+        booking = self.factory.booking()
+        booking_id = self.client.create_booking(booking)['bookingid']
+        try:
+            self.client.get_booking_by_id(booking_id)
+            self.client.get_bookings_ids(params={'lastname': booking['lastname']})
+            self.client.update_booking(booking_id, self.factory.booking())
+            self.client.partial_update_booking(booking_id, {'firstname': self.factory.booking()['firstname']})
+        finally:
+            self.client.delete_booking(booking_id)
+
+    def sample(self, started) -> ResourceSample:
+        return ResourceSample(
+            elapsed=time.perf_counter() - started,
+            iterations=self.iterations,
+            rss=rss_bytes(),
+            traced=tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+            fds=open_fds(),
+            connections=pooled_connections(self.client.session),
+        )
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+    def run(self) -> dict:
+        started_at = datetime.now(timezone.utc)
+        # building the faker pools under tracemalloc would take most of a short warmup
+        self.factory.warm_up()
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(self.frames)
+        try:
+            started = time.perf_counter()
+            measure_from, end = started + self.warmup, started + self.warmup + self.duration
+            while time.perf_counter() < measure_from:
+                self._iterate()
+            # the baseline is taken once pools, caches and lazy imports have settled
+            baseline, samples = self._snapshot(), [self.sample(started)]
+            next_sample = time.perf_counter() + self.interval
+            while time.perf_counter() < end:
+                self._iterate()
+                if time.perf_counter() >= next_sample:
+                    samples.append(self.sample(started))
+                    next_sample += self.interval
+            samples.append(self.sample(started))
+            sites = top_sites(baseline, self._snapshot())
+        finally:
+            if owns_tracing:
+                tracemalloc.stop()
+        report = {
+            'started_at': started_at.isoformat(),
+            'config': {
+                'duration': self.duration,
+                'interval': self.interval,
+                'warmup': self.warmup,
+                'budgets': asdict(self.budgets),
+                'base_url': self.client.base_url,
+            },
+            'iterations': self.iterations,
+            'errors': dict(self.errors),
+            'samples': [asdict(sample) for sample in samples],
+            'top_sites': sites,
+        }
+        report.update(analyze(samples, self.budgets, sum(self.errors.values())))
+        return report
+
+    def _iterate(self):
+        try:
+            self.lifecycle()
+        except Exception as e:
+            self.errors[type(e).__name__] += 1
+        self.iterations += 1
+
+
+def _size(name, value):
+    if value is None:
+        return '-'
+    return f'{value / MB:+.2f}MB' if name in ('rss', 'traced') else f'{value:+.1f}'
+
+def format_report(report: dict) -> str:
+    lines = [f"iterations: {report['iterations']}, errors: {sum(report['errors'].values())}"]
+    for name, trend in report['trends'].items():
+        if trend is None:
+            lines.append(f'{name:<12} n/a')
+            continue
+        per_hour = f"{_size(name, trend['per_hour'])}/h" if trend['per_hour'] is not None else ''
+        lines.append(f"{name:<12}{_size(name, trend['growth']):>12}{per_hour:>14}  {'rising' if trend['rising'] else 'flat'}")
+    if report['top_sites']:
+        lines.append('top growing allocation sites:')
+        for site in report['top_sites']:
+            lines.append(f"  {site['size_diff'] / 1024:+10.1f} KiB {site['count_diff']:+8d}  {site['site']}")
+    for violation in report['violations']:
+        lines.append(f'BUDGET EXCEEDED {violation}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Loop booking lifecycles and track memory, descriptor and connection growth')
+    parser.add_argument('--duration', type=float, default=Soak.DURATION.value, help='measured seconds')
+    parser.add_argument('--interval', type=float, default=Soak.INTERVAL.value, help='seconds between samples')
+    parser.add_argument('--warmup', type=float, default=Soak.WARMUP.value, help='seconds before the baseline is taken')
+    parser.add_argument('--rss-budget-mb', type=float, default=Soak.RSS_BUDGET_MB.value)
+    parser.add_argument('--traced-budget-mb', type=float, default=Soak.TRACED_BUDGET_MB.value)
+    parser.add_argument('--fds-budget', type=int, default=Soak.FDS_BUDGET.value)
+    parser.add_argument('--connections-budget', type=int, default=Soak.CONNECTIONS_BUDGET.value)
+    parser.add_argument('--error-rate-budget', type=float, default=Soak.ERROR_RATE_BUDGET.value,
+                        help='share of iterations allowed to fail')
+    parser.add_argument('--frames', type=int, default=Soak.FRAMES.value, help='traceback depth of allocation sites')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--reporting-level', choices=[level.value for level in ReportingLevel],
+                        default=os.getenv('REPORTING_LEVEL') or ReportingLevel.FULL.value, help='allure step reporting during the run')
+    args = parser.parse_args(argv)
+    steps.set_level(args.reporting_level)
+
+    budgets = SoakBudgets(int(args.rss_budget_mb * MB), int(args.traced_budget_mb * MB), args.fds_budget, args.connections_budget,
+                          args.error_rate_budget)
+    client = APIClient()
+    runner = SoakRunner(client, args.duration, args.interval, args.warmup, budgets, args.frames, args.seed)
+    try:
+        report = runner.run()
+    finally:
+        # lifecycles that failed before their delete leave their bookings in the client's registry
+        failed = client.registry.teardown(client)
+        if failed:
+            print(f'Failed to delete {len(failed)} bookings: {failed[:20]}')
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    return 1 if report['violations'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
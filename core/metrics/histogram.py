@@ -0,0 +1,74 @@
+import math
+import threading
+
+
+class LatencyHistogram:
+    def __init__(self, significant_digits=2):
+        self.significant_digits = significant_digits
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_bits = int(math.log2(sub_bucket_count))
+        self._half = sub_bucket_count // 2
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        bucket = max(0, value.bit_length() - self._sub_bucket_bits)
+        return bucket * self._half + (value >> bucket)
+
+    def _highest_equivalent(self, index):
+        bucket = max(0, index // self._half - 1)
+        low = (index - bucket * self._half) << bucket
+        return low + (1 << bucket) - 1
+
+    def record(self, value, count=1):
+        value = max(0, int(value))
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + count
+            self.count += count
+            self.total += value * count
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = max(self.max, value)
+
+    def merge(self, other):
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, low, high = other.count, other.total, other.min, other.max
+        with self._lock:
+            for index, value in counts.items():
+                self._counts[index] = self._counts.get(index, 0) + value
+            self.count += count
+            self.total += total
+            if low is not None:
+                self.min = low if self.min is None else min(self.min, low)
+            self.max = max(self.max, high)
+        return self
+
+    def percentile(self, percentile):
+        with self._lock:
+            if not self.count:
+                return 0
+            target = max(1, math.ceil(percentile / 100 * self.count))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    return min(self._highest_equivalent(index), self.max)
+            return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self, scale=1000.0, percentiles=(50, 95, 99)):
+        summary = {f'p{percentile:g}': self.percentile(percentile) / scale for percentile in percentiles}
+        summary.update({
+            'min': (self.min or 0) / scale,
+            'mean': self.mean / scale,
+            'max': self.max / scale,
+        })
+        return summary
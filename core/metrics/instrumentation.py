@@ -0,0 +1,240 @@
+import heapq
+import itertools
+import json
+import socket
+import threading
+import time
+from dataclasses import dataclass, asdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from core.clients.endpoints import Endpoints
+from core.metrics.histogram import LatencyHistogram
+from core.settings.config import Metrics
+
+
+PHASES = ('dns', 'connect', 'ttfb', 'total')
+MICROSECONDS = 1_000_000
+
+_active = threading.local()
+
+
+@dataclass
+class CallRecord:
+    endpoint: str
+    method: str
+    url: str = ''
+    test: str = None
+    status: object = None
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    total: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    retries: int = 0
+    started: float = 0.0
+
+
+def active_call():
+    return getattr(_active, 'call', None)
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self.statuses = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+
+
+class RequestMetrics:
+    def __init__(self, slowest=Metrics.SLOWEST_CALLS.value):
+        self.slowest_limit = slowest
+        self.test = None
+        self._endpoints = {endpoint.name: _EndpointStats() for endpoint in Endpoints}
+        self._slowest = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self, endpoint, method, url=''):
+        name = endpoint.name if isinstance(endpoint, Endpoints) else str(endpoint)
+        call = CallRecord(name, method.upper(), url, self.test, started=time.perf_counter())
+        _active.call = call
+        return call
+
+    def finish(self, call, response=None):
+        _active.call = None
+        call.total = time.perf_counter() - call.started
+        call.status = getattr(response, 'status_code', None) if response is not None else 'error'
+        if isinstance(response, requests.Response):
+            call.ttfb = max(0.0, response.elapsed.total_seconds() - call.dns - call.connect)
+            body = response.request.body if response.request is not None else None
+            call.request_bytes = len(body) if body else 0
+            raw = response.raw
+            if raw is None:
+                call.response_bytes = len(response.content or b'')
+            else:
+                call.response_bytes = raw.tell() if hasattr(raw, 'tell') else 0
+                retries = getattr(raw, 'retries', None)
+                call.retries = len(retries.history) if retries is not None else 0
+        self.observe(call)
+        return call
+
+    def observe(self, call):
+        stats = self._endpoints.get(call.endpoint)
+        if stats is None:
+            stats = self._endpoints.setdefault(call.endpoint, _EndpointStats())
+        for phase in PHASES:
+            stats.histograms[phase].record(getattr(call, phase) * MICROSECONDS)
+        with self._lock:
+            status = str(call.status)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.request_bytes += call.request_bytes
+            stats.response_bytes += call.response_bytes
+            stats.retries += call.retries
+            if call.test is not None and self.slowest_limit:
+                heap = self._slowest.setdefault(call.test, [])
+                entry = (call.total, next(self._sequence), call)
+                if len(heap) < self.slowest_limit:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heappushpop(heap, entry)
+
+    def slowest(self, test) -> list:
+        with self._lock:
+            heap = self._slowest.get(test, [])
+            return [call for _, _, call in sorted(heap, key=lambda entry: -entry[0])]
+
+    def pop_slowest(self, test) -> list:
+        calls = self.slowest(test)
+        with self._lock:
+            self._slowest.pop(test, None)
+        return calls
+
+    def summary(self) -> dict:
+        summary = {}
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        for name, stats in endpoints:
+            calls = stats.histograms['total'].count
+            if not calls:
+                continue
+            summary[name] = {
+                'calls': calls,
+                'statuses': dict(stats.statuses),
+                'request_bytes': stats.request_bytes,
+                'response_bytes': stats.response_bytes,
+                'retries': stats.retries,
+            }
+            summary[name].update({phase: stats.histograms[phase].summary(scale=MICROSECONDS) for phase in PHASES})
+        return summary
+
+    def to_prometheus(self, labels=None) -> str:
+        prefix = Metrics.PREFIX.value
+        extra = ''.join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        summary = self.summary()
+        lines = [
+            f'# HELP {prefix}_request_duration_seconds Request phase durations per endpoint.',
+            f'# TYPE {prefix}_request_duration_seconds summary',
+        ]
+        for name, stats in summary.items():
+            for phase in PHASES:
+                histogram = self._endpoints[name].histograms[phase]
+                series = f'endpoint="{name}",phase="{phase}"{extra}'
+                for quantile in (0.5, 0.95, 0.99):
+                    lines.append(f'{prefix}_request_duration_seconds{{{series},quantile="{quantile}"}} {histogram.percentile(quantile * 100) / MICROSECONDS}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{series}}} {histogram.total / MICROSECONDS}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{series}}} {histogram.count}')
+        lines += [f'# HELP {prefix}_responses_total Responses per endpoint and status.', f'# TYPE {prefix}_responses_total counter']
+        for name, stats in summary.items():
+            for status, count in sorted(stats['statuses'].items()):
+                lines.append(f'{prefix}_responses_total{{endpoint="{name}",status="{status}"{extra}}} {count}')
+        lines += [f'# HELP {prefix}_request_bytes_total Body bytes per endpoint and direction.', f'# TYPE {prefix}_request_bytes_total counter']
+        for name, stats in summary.items():
+            lines.append(f'{prefix}_request_bytes_total{{endpoint="{name}",direction="sent"{extra}}} {stats["request_bytes"]}')
+            lines.append(f'{prefix}_request_bytes_total{{endpoint="{name}",direction="received"{extra}}} {stats["response_bytes"]}')
+        lines += [f'# HELP {prefix}_request_retries_total Retries per endpoint.', f'# TYPE {prefix}_request_retries_total counter']
+        for name, stats in summary.items():
+            lines.append(f'{prefix}_request_retries_total{{endpoint="{name}"{extra}}} {stats["retries"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, labels=None):
+        with open(path, 'w') as file:
+            file.write(self.to_prometheus(labels))
+
+    def write_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {endpoint.name: _EndpointStats() for endpoint in Endpoints}
+            self._slowest = {}
+
+
+def format_calls(calls) -> str:
+    lines = [f'{"total ms":>9} {"ttfb ms":>9} {"connect ms":>10} {"status":>6}  method  url']
+    for call in calls:
+        lines.append(f'{call.total * 1000:9.2f} {call.ttfb * 1000:9.2f} {(call.dns + call.connect) * 1000:10.2f} {call.status!s:>6}  {call.method:<6}  {call.url}')
+    return '\n'.join(lines)
+
+def calls_to_json(calls) -> str:
+    return json.dumps([{key: value for key, value in asdict(call).items() if key != 'started'} for call in calls], indent=2)
+
+
+REQUEST_METRICS = RequestMetrics()
+
+
+class TimedConnectionMixin:
+    def _new_conn(self):
+        call = active_call()
+        if call is None:
+            return super()._new_conn()
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)))
+        except OSError:
+            # let urllib3 raise its usual resolution error
+            addresses = [host]
+        resolved = time.perf_counter()
+        call.dns += resolved - started
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except NewConnectionError:
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            call.connect += time.perf_counter() - resolved
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
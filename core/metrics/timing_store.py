@@ -0,0 +1,95 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+from core.clients.token_cache import _file_lock
+from core.settings.config import Timing
+
+
+class TimingStore:
+    def __init__(self, path=Timing.PATH.value):
+        self.path = path
+
+    def load(self) -> dict:
+        try:
+            with open(self.path) as file:
+                document = json.load(file)
+        except (FileNotFoundError, ValueError):
+            document = {}
+        if 'runs' not in document:
+            # files written by --store-durations before runs were kept hold only the durations
+            document = {'durations': document, 'runs': []}
+        return document
+
+    def record(self, run, results, finished=None, keep=Timing.KEEP_RUNS.value):
+        # results holds (nodeid, feature, story, outcome, duration) rows of one run
+        finished = time.time() if finished is None else finished
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with _file_lock(self.path + '.lock'):
+            document = self.load()
+            runs = [entry for entry in document['runs'] if entry['run'] != run]
+            runs.append({'run': run, 'finished': finished, 'results': {
+                nodeid: {'feature': feature, 'story': story, 'outcome': outcome, 'duration': duration}
+                for nodeid, feature, story, outcome, duration in results
+            }})
+            document['runs'] = sorted(runs, key=lambda entry: entry['finished'])[-keep:]
+            document['durations'].update({nodeid: duration for nodeid, _, _, outcome, duration in results if outcome != 'skipped'})
+            document['durations'] = dict(sorted(document['durations'].items()))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.durations-')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(document, file, indent=2)
+            os.replace(temp_path, self.path)
+
+    def _runs(self, limit=None) -> list:
+        runs = sorted(self.load()['runs'], key=lambda entry: entry['finished'], reverse=True)
+        return runs[:limit] if limit else runs
+
+    def runs(self, limit=None) -> list:
+        return [entry['run'] for entry in self._runs(limit)]
+
+    def durations(self, history=Timing.HISTORY_RUNS.value) -> dict:
+        document = self.load()
+        samples = defaultdict(list)
+        for entry in self._runs(history):
+            for nodeid, result in entry['results'].items():
+                if result['outcome'] != 'skipped':
+                    samples[nodeid].append(result['duration'])
+        durations = dict(document['durations'])
+        durations.update({nodeid: statistics.median(values) for nodeid, values in samples.items()})
+        return durations
+
+    def recent_failures(self, runs=Timing.FAILED_RUNS.value) -> set:
+        return {nodeid for entry in self._runs(runs) for nodeid, result in entry['results'].items() if result['outcome'] == 'failed'}
+
+    def trends(self, history=Timing.HISTORY_RUNS.value) -> list:
+        runs = self._runs(history + 1)
+        totals = defaultdict(lambda: defaultdict(float))
+        for entry in runs:
+            for result in entry['results'].values():
+                totals[(result['feature'], result['story'])][entry['run']] += result['duration']
+        trends = []
+        for (feature, story), per_run in totals.items():
+            if runs[0]['run'] not in per_run:
+                continue
+            previous = [per_run[entry['run']] for entry in runs[1:] if entry['run'] in per_run]
+            baseline = statistics.mean(previous) if previous else None
+            current = per_run[runs[0]['run']]
+            trends.append({
+                'feature': feature,
+                'story': story,
+                'current': current,
+                'baseline': baseline,
+                'change': (current - baseline) / baseline if baseline else None,
+                'runs': len(previous) + 1,
+            })
+        return sorted(trends, key=lambda trend: (trend['change'] is None, -abs(trend['change'] or 0), trend['feature'] or '', trend['story'] or ''))
+
+
+def order(nodeids, durations: dict, failed: set) -> list:
+    known = [duration for duration in durations.values() if duration is not None]
+    default = statistics.median(known) if known else 0.0
+    position = {nodeid: index for index, nodeid in enumerate(nodeids)}
+    return sorted(nodeids, key=lambda nodeid: (nodeid not in failed, -durations.get(nodeid, default), position[nodeid]))
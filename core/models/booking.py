@@ -18,3 +18,6 @@ class Booking(BaseModel):
 class BookingResponse(BaseModel):
     bookingid: int
     booking: Booking
+
+class BookingId(BaseModel):
+    bookingid: int
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import List
+
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter_for(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+def validate_json(model, raw):
+    return adapter_for(model).validate_json(raw)
+
+def validate_many(model, raws):
+    return adapter_for(List[model]).validate_json(b'[' + b','.join(raws) + b']')
+
+def to_jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json', exclude_none=True)
+    if isinstance(value, list):
+        return [to_jsonable(item) for item in value]
+    return value
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from core.data.namespace import run_id, worker_name
+from core.metrics.instrumentation import REQUEST_METRICS, format_calls, calls_to_json
+from core.settings.config import Metrics
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('metrics')
+    group.addoption('--metrics-dir', default=os.getenv('METRICS_DIR'),
+                    help='write per-endpoint request metrics (Prometheus text and JSON) into this directory')
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    REQUEST_METRICS.test = item.nodeid
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    calls = REQUEST_METRICS.pop_slowest(item.nodeid)
+    REQUEST_METRICS.test = None
+    if calls:
+        import allure
+
+        allure.attach(format_calls(calls), name='Slowest API calls', attachment_type=allure.attachment_type.TEXT)
+        allure.attach(calls_to_json(calls), name='Slowest API calls (json)', attachment_type=allure.attachment_type.JSON)
+
+
+def pytest_sessionfinish(session):
+    directory = session.config.getoption('metrics_dir')
+    if not directory or not REQUEST_METRICS.summary():
+        return
+    os.makedirs(directory, exist_ok=True)
+    worker = worker_name()
+    base = os.path.join(directory, f'{Metrics.FILE_NAME.value}-{worker}')
+    REQUEST_METRICS.write_prometheus(base + '.prom', {'run': run_id(), 'worker': worker})
+    REQUEST_METRICS.write_json(base + '.json')
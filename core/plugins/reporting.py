@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from core.reporting import steps
+from core.settings.config import ReportingLevel
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('reporting')
+    group.addoption('--reporting-level', choices=[level.value for level in ReportingLevel], default=os.getenv('REPORTING_LEVEL'),
+                    help='full: live allure steps, summary: buffered steps flushed in detail only on failure, off: no API steps')
+
+
+def pytest_configure(config):
+    level = config.getoption('reporting_level')
+    if level:
+        steps.set_level(level)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.api_steps_failed = False
+    steps.discard()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if outcome.get_result().failed:
+        item.api_steps_failed = True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    if steps.get_level() is ReportingLevel.SUMMARY:
+        steps.flush(failed=getattr(item, 'api_steps_failed', False))
@@ -0,0 +1,68 @@
+import os
+import statistics
+
+import pytest
+
+from core.data.namespace import run_id
+from core.metrics.timing_store import TimingStore
+from core.settings.config import Timing
+from core.settings.environment import env_value
+
+
+DEFAULT_DURATION = 1.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('sharding')
+    group.addoption('--shards', type=int, default=int(os.getenv('SHARD_COUNT') or 1),
+                    help='split the suite into this many runtime-balanced shards')
+    group.addoption('--shard-id', type=int, default=int(os.getenv('SHARD_INDEX') or 0),
+                    help='zero-based shard to run')
+    group.addoption('--durations-path', default=os.getenv('TEST_DURATIONS_PATH') or Timing.PATH.value,
+                    help='file with per-test durations and outcomes of previous runs')
+    group.addoption('--store-durations', action='store_true', default=env_value('STORE_DURATIONS', False, bool),
+                    help='record durations, outcomes and allure labels of this run in the durations file')
+
+
+def _is_worker(config):
+    return hasattr(config, 'workerinput')
+
+
+def load_durations(path) -> dict:
+    return TimingStore(path).durations()
+
+
+def balance(durations: dict, shards: int) -> list:
+    known = [duration for duration in durations.values() if duration is not None]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    loads = [0.0] * shards
+    buckets = [[] for _ in range(shards)]
+    ordered = sorted(durations.items(), key=lambda item: (-(item[1] if item[1] is not None else default), item[0]))
+    for nodeid, duration in ordered:
+        shard = min(range(shards), key=lambda index: (loads[index], index))
+        buckets[shard].append(nodeid)
+        loads[shard] += duration if duration is not None else default
+    return buckets
+
+
+def pytest_configure(config):
+    if not _is_worker(config):
+        run_id()
+    shards, shard_id = config.getoption('shards'), config.getoption('shard_id')
+    if shards < 1 or not 0 <= shard_id < shards:
+        raise pytest.UsageError(f'Invalid shard {shard_id} of {shards}')
+
+
+def pytest_collection_modifyitems(session, config, items):
+    shards = config.getoption('shards')
+    if shards == 1:
+        return
+    known = load_durations(config.getoption('durations_path'))
+    durations = {item.nodeid: known.get(item.nodeid) for item in items}
+    selected_ids = set(balance(durations, shards)[config.getoption('shard_id')])
+    selected = [item for item in items if item.nodeid in selected_ids]
+    deselected = [item for item in items if item.nodeid not in selected_ids]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from core.data.namespace import run_id
+from core.metrics.timing_store import TimingStore, order
+from core.plugins.sharding import _is_worker
+from core.settings.config import Timing
+
+
+ORDERS = ('failed-longest', 'none')
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('timing')
+    group.addoption('--timing-order', choices=ORDERS, default=os.getenv('TIMING_ORDER') or ORDERS[0],
+                    help='run recently failed tests first, then the longest ones, within each module')
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    path = config.getoption('durations_path')
+    if config.getoption('timing_order') == 'none' or not os.path.exists(path):
+        return
+    store = TimingStore(path)
+    durations, failed = store.durations(), store.recent_failures()
+    # tests only move inside their module or class, so module and class scoped fixtures are still set up once
+    groups = {}
+    for item in items:
+        groups.setdefault(item.parent.nodeid, {})[item.nodeid] = item
+    items[:] = [group[nodeid] for group in groups.values() for nodeid in order(list(group), durations, failed)]
+
+
+def _labels(item):
+    labels = {}
+    for marker in item.iter_markers('allure_label'):
+        if marker.kwargs.get('label_type') in ('feature', 'story') and marker.args:
+            labels.setdefault(marker.kwargs['label_type'], marker.args[0])
+    return labels.get('feature'), labels.get('story')
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    # plain attributes travel with the report from xdist workers to the controller
+    outcome.get_result().timing_labels = _labels(item)
+
+
+def pytest_runtest_logreport(report):
+    feature, story = getattr(report, 'timing_labels', None) or (None, None)
+    result = _results.setdefault(report.nodeid, {'feature': feature, 'story': story, 'outcome': 'passed', 'duration': 0.0})
+    result['duration'] += report.duration
+    if report.failed:
+        result['outcome'] = 'failed'
+    elif report.skipped and result['outcome'] == 'passed':
+        result['outcome'] = 'skipped'
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if _is_worker(config) or not config.getoption('store_durations') or not _results:
+        return
+    TimingStore(config.getoption('durations_path')).record(run_id(), [
+        (nodeid, result['feature'], result['story'], result['outcome'], round(result['duration'], 4))
+        for nodeid, result in _results.items()
+    ])
+
+
+def format_trends(trends, threshold=Timing.TREND_THRESHOLD.value) -> list:
+    lines = []
+    for trend in trends:
+        change = trend['change']
+        marker = '!' if change is not None and abs(change) >= threshold else ' '
+        delta = f'{change:+.0%}' if change is not None else 'new'
+        baseline = f"{trend['baseline']:.2f}s" if trend['baseline'] is not None else '-'
+        lines.append(f"{marker} {trend['feature'] or '-'} / {trend['story'] or '-'}: {trend['current']:.2f}s vs {baseline} ({delta})")
+    return lines
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _is_worker(config) or not config.getoption('store_durations') or not _results:
+        return
+    trends = TimingStore(config.getoption('durations_path')).trends()
+    # sub-second groups jitter by tens of percent between runs, so only report changes that cost real time
+    changed = [trend for trend in trends if trend['change'] is not None and abs(trend['change']) >= Timing.TREND_THRESHOLD.value
+               and abs(trend['current'] - trend['baseline']) >= Timing.TREND_MIN_DELTA.value]
+    if changed:
+        terminalreporter.write_sep('-', 'timing trends by allure feature / story')
+        for line in format_trends(changed):
+            terminalreporter.write_line(line)
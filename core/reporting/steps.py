@@ -0,0 +1,132 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from core.settings.config import Reporting, ReportingLevel
+
+
+_NULL_STEP = nullcontext()
+_parent = contextvars.ContextVar('step_parent', default=None)
+
+
+class StepBuffer:
+    def __init__(self, max_size=Reporting.BUFFER_SIZE.value):
+        self.records = deque(maxlen=max_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        with self._lock:
+            if len(self.records) == self.records.maxlen:
+                self.dropped += 1
+            self.records.append(record)
+
+    def drain(self):
+        with self._lock:
+            records, dropped = list(self.records), self.dropped
+            self.records.clear()
+            self.dropped = 0
+        return records, dropped
+
+
+class BufferedStep:
+    __slots__ = ('title', 'parent', 'started', 'duration', 'error', '_token')
+
+    def __init__(self, title):
+        self.title = title
+        self.duration = None
+        self.error = None
+
+    def __enter__(self):
+        # steps of bulk workers interleave in the buffer, so nesting is kept as a link to the enclosing step
+        self.parent = _parent.get()
+        self._token = _parent.set(self)
+        _buffer.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter() - self.started
+        _parent.reset(self._token)
+        if exc_type is not None:
+            self.error = (exc_type, exc_val)
+        return False
+
+
+_buffer = StepBuffer()
+_level = ReportingLevel(os.getenv('REPORTING_LEVEL') or Reporting.LEVEL.value)
+
+
+def get_level() -> ReportingLevel:
+    return _level
+
+def set_level(level):
+    global _level
+    _level = ReportingLevel(getattr(level, 'value', level))
+    _buffer.drain()
+    return _level
+
+def step(title):
+    if _level is ReportingLevel.FULL:
+        import allure
+
+        return allure.step(title)
+    if _level is ReportingLevel.OFF:
+        return _NULL_STEP
+    return BufferedStep(title)
+
+def _replay(records):
+    buffered = {id(record) for record in records}
+    children = {}
+    for record in records:
+        # steps whose parent was dropped from the buffer are replayed at the top level
+        parent = id(record.parent) if record.parent is not None and id(record.parent) in buffered else None
+        children.setdefault(parent, []).append(record)
+    for record in children.get(None, ()):
+        _replay_step(record, children)
+
+def _replay_step(record, children):
+    import allure
+
+    context = allure.step(f'{record.title} [{_milliseconds(record.duration)}]')
+    context.__enter__()
+    for child in children.get(id(record), ()):
+        _replay_step(child, children)
+    exc_type, exc_val = record.error or (None, None)
+    context.__exit__(exc_type, exc_val, None)
+
+def _summarize(records):
+    import allure
+
+    totals = {}
+    for record in records:
+        count, duration, failures = totals.get(record.title, (0, 0.0, 0))
+        totals[record.title] = (count + 1, duration + (record.duration or 0.0), failures + (record.error is not None))
+    for title, (count, duration, failures) in totals.items():
+        failed = f', {failures} failed' if failures else ''
+        with allure.step(f'{title} x{count} [{_milliseconds(duration)}{failed}]'):
+            pass
+
+def _milliseconds(duration):
+    return 'unfinished' if duration is None else f'{duration * 1000:.1f} ms'
+
+def flush(failed=False):
+    records, dropped = _buffer.drain()
+    if not records:
+        return 0
+    if dropped:
+        import allure
+
+        allure.attach(f'{dropped} earlier steps were dropped from the reporting buffer', name='Dropped steps',
+                      attachment_type=allure.attachment_type.TEXT)
+    if failed:
+        _replay(records)
+    else:
+        _summarize(records)
+    return len(records)
+
+def discard():
+    _buffer.drain()
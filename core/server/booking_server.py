@@ -0,0 +1,325 @@
+import argparse
+import base64
+import hashlib
+import json
+import secrets
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from core.clients.endpoints import Endpoints
+from core.settings.config import Users
+
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+
+class BookingValidationError(ValueError):
+    pass
+
+
+def _parse_date(value) -> date:
+    if not isinstance(value, str):
+        raise BookingValidationError(f'Invalid date: {value!r}')
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise BookingValidationError(f'Invalid date: {value!r}')
+
+def _parse_price(value) -> int:
+    if isinstance(value, bool):
+        raise BookingValidationError(f'Invalid totalprice: {value!r}')
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        if isinstance(value, str):
+            return int(float(value))
+    except (ValueError, OverflowError):
+        # NaN and Infinity parse as floats but have no integer value
+        pass
+    raise BookingValidationError(f'Invalid totalprice: {value!r}')
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if value in ('true', 'false'):
+        return value == 'true'
+    raise BookingValidationError(f'Invalid depositpaid: {value!r}')
+
+def validate_booking(data) -> dict:
+    if not isinstance(data, dict):
+        raise BookingValidationError('Booking must be an object')
+    for field in ('firstname', 'lastname'):
+        if not isinstance(data.get(field), str):
+            raise BookingValidationError(f'Missing or invalid {field}')
+    dates = data.get('bookingdates')
+    if not isinstance(dates, dict):
+        raise BookingValidationError('Missing bookingdates')
+    booking = {
+        'firstname': data['firstname'],
+        'lastname': data['lastname'],
+        'totalprice': _parse_price(data.get('totalprice')),
+        'depositpaid': _parse_bool(data.get('depositpaid')),
+        'bookingdates': {
+            'checkin': _parse_date(dates.get('checkin')).isoformat(),
+            'checkout': _parse_date(dates.get('checkout')).isoformat()
+        }
+    }
+    if data.get('additionalneeds') is not None:
+        booking['additionalneeds'] = str(data['additionalneeds'])
+    return booking
+
+
+class BookingStore:
+    def __init__(self):
+        self._bookings = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._bookings)
+
+    def create(self, booking) -> int:
+        with self._lock:
+            booking_id = self._next_id
+            self._next_id += 1
+            self._bookings[booking_id] = booking
+            return booking_id
+
+    def get(self, booking_id):
+        with self._lock:
+            return self._bookings.get(booking_id)
+
+    def replace(self, booking_id, booking) -> bool:
+        with self._lock:
+            if booking_id not in self._bookings:
+                return False
+            self._bookings[booking_id] = booking
+            return True
+
+    def delete(self, booking_id) -> bool:
+        with self._lock:
+            return self._bookings.pop(booking_id, None) is not None
+
+    def ids(self, firstname=None, lastname=None, checkin=None, checkout=None) -> list:
+        with self._lock:
+            items = list(self._bookings.items())
+        result = []
+        for booking_id, booking in items:
+            if firstname is not None and booking['firstname'] != firstname:
+                continue
+            if lastname is not None and booking['lastname'] != lastname:
+                continue
+            if checkin is not None and booking['bookingdates']['checkin'] < checkin:
+                continue
+            if checkout is not None and booking['bookingdates']['checkout'] < checkout:
+                continue
+            result.append(booking_id)
+        return result
+
+
+class BookingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'LocalBooker/1.0'
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if getattr(self, '_body', None) is None:
+            length = int(self.headers.get('Content-Length') or 0)
+            self._body = self.rfile.read(length) if length else b''
+        return self._body
+
+    def _send(self, status, body=None, content_type='application/json; charset=utf-8', etag=False):
+        # drain unread request bodies so the next request on a kept-alive connection parses cleanly
+        self._read_body()
+        self._body = None
+        if body is None:
+            payload = b''
+        elif isinstance(body, str):
+            payload, content_type = body.encode(), 'text/plain; charset=utf-8'
+        else:
+            payload = json.dumps(body).encode()
+        tag = f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"' if etag else None
+        if tag is not None and self.headers.get('If-None-Match') == tag:
+            self.send_response(304)
+            self.send_header('ETag', tag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        if tag is not None:
+            self.send_header('ETag', tag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        raw = self._read_body()
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise BookingValidationError('Malformed JSON body')
+
+    def _authorized(self) -> bool:
+        cookie = self.headers.get('Cookie', '')
+        for part in cookie.split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == 'token' and value in self.server.tokens:
+                return True
+        authorization = self.headers.get('Authorization', '')
+        if authorization.startswith('Basic '):
+            expected = base64.b64encode(f'{Users.USERNAME.value}:{Users.PASSWORD.value}'.encode()).decode()
+            return authorization[6:].strip() == expected
+        return False
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        if not segments:
+            return None, None, query
+        endpoint = '/' + segments[0]
+        if len(segments) == 1:
+            return endpoint, None, query
+        if len(segments) == 2 and endpoint == Endpoints.BOOKING_ENDPOINT.value and segments[1].isdigit():
+            return endpoint, int(segments[1]), query
+        return None, None, query
+
+    def do_GET(self):
+        endpoint, booking_id, query = self._route()
+        if endpoint == Endpoints.PING_ENDPOINT.value:
+            return self._send(201, 'Created')
+        if endpoint != Endpoints.BOOKING_ENDPOINT.value:
+            return self._send(404, 'Not Found')
+        if booking_id is None:
+            filters = {name: query[name][0] for name in ('firstname', 'lastname', 'checkin', 'checkout') if name in query}
+            try:
+                for name in ('checkin', 'checkout'):
+                    if name in filters:
+                        filters[name] = _parse_date(filters[name]).isoformat()
+            except BookingValidationError:
+                return self._send(500, 'Internal Server Error')
+            return self._send(200, [{'bookingid': found} for found in self.server.store.ids(**filters)])
+        booking = self.server.store.get(booking_id)
+        if booking is None:
+            return self._send(404, 'Not Found')
+        return self._send(200, booking, etag=True)
+
+    def do_POST(self):
+        endpoint, booking_id, _ = self._route()
+        try:
+            data = self._read_json()
+        except BookingValidationError:
+            return self._send(400, 'Bad Request')
+        if endpoint == Endpoints.AUTH_ENDPOINT.value:
+            credentials = data if isinstance(data, dict) else {}
+            if credentials.get('username') == Users.USERNAME.value and credentials.get('password') == Users.PASSWORD.value:
+                token = secrets.token_hex(8)
+                self.server.tokens.add(token)
+                return self._send(200, {'token': token})
+            return self._send(200, {'reason': 'Bad credentials'})
+        if endpoint != Endpoints.BOOKING_ENDPOINT.value or booking_id is not None:
+            return self._send(404, 'Not Found')
+        try:
+            booking = validate_booking(data)
+        except BookingValidationError:
+            return self._send(500, 'Internal Server Error')
+        return self._send(200, {'bookingid': self.server.store.create(booking), 'booking': booking})
+
+    def _update(self, partial):
+        endpoint, booking_id, _ = self._route()
+        if endpoint != Endpoints.BOOKING_ENDPOINT.value or booking_id is None:
+            return self._send(404, 'Not Found')
+        if not self._authorized():
+            return self._send(403, 'Forbidden')
+        current = self.server.store.get(booking_id)
+        if current is None:
+            return self._send(405, 'Method Not Allowed')
+        try:
+            data = self._read_json()
+            if partial:
+                if not isinstance(data, dict) or not isinstance(data.get('bookingdates', {}), dict):
+                    raise BookingValidationError('Malformed partial booking')
+                merged = dict(current, **{key: value for key, value in data.items() if key != 'bookingdates'})
+                merged['bookingdates'] = dict(current['bookingdates'], **(data.get('bookingdates') or {}))
+                data = merged
+            booking = validate_booking(data)
+        except BookingValidationError:
+            return self._send(400, 'Bad Request')
+        self.server.store.replace(booking_id, booking)
+        return self._send(200, booking)
+
+    def do_PUT(self):
+        self._update(partial=False)
+
+    def do_PATCH(self):
+        self._update(partial=True)
+
+    def do_DELETE(self):
+        endpoint, booking_id, _ = self._route()
+        if endpoint != Endpoints.BOOKING_ENDPOINT.value or booking_id is None:
+            return self._send(404, 'Not Found')
+        if not self._authorized():
+            return self._send(403, 'Forbidden')
+        if not self.server.store.delete(booking_id):
+            return self._send(405, 'Method Not Allowed')
+        return self._send(201, 'Created')
+
+
+class BookingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, store=None):
+        super().__init__((host, port), BookingRequestHandler)
+        self.store = store if store is not None else BookingStore()
+        self.tokens = set()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, name='booking-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve an in-memory stand-in of the booking API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9090)
+    args = parser.parse_args(argv)
+    server = BookingServer(args.host, args.port)
+    print(f'Serving booking API on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
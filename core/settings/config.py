@@ -7,4 +7,138 @@ class Users(Enum):
 
 class Timeouts(Enum):
     TIMEOUT = 5
+    CONNECT_TIMEOUT = 3.05
 
+class EndpointTimeouts(Enum):
+    PING_ENDPOINT = 5
+    AUTH_ENDPOINT = 5
+    BOOKING_ENDPOINT = 10
+
+class Pool(Enum):
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 50
+    POOL_BLOCK = False
+    KEEP_ALIVE = True
+
+class Retries(Enum):
+    TOTAL = 3
+    BACKOFF_FACTOR = 0.3
+    BACKOFF_JITTER = 0.3
+    BACKOFF_MAX = 10
+    STATUS_FORCELIST = (429, 502, 503, 504)
+
+class CircuitBreakerSettings(Enum):
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+    FAILURE_STATUSES = (502, 503, 504)
+
+class TokenCacheSettings(Enum):
+    FILE_NAME = 'ddbooking_tokens.json'
+    TTL = 600
+
+class Cache(Enum):
+    MAX_SIZE = 1024
+    TTL = 30
+
+class QueryIndex(Enum):
+    MAX_AGE = 300
+
+class BookingFilters(Enum):
+    FIRSTNAME = 'firstname'
+    LASTNAME = 'lastname'
+    CHECKIN = 'checkin'
+    CHECKOUT = 'checkout'
+
+class Streaming(Enum):
+    CHUNK_SIZE = 64 * 1024
+    PREFETCH = 8
+
+class Teardown(Enum):
+    RETRIES = 3
+    BACKOFF = 0.5
+
+class Concurrency(Enum):
+    MAX_CONCURRENCY = 100
+    BULK_WORKERS = 16
+
+class BookingData(Enum):
+    LOCALE = 'en_US'
+    BATCH_SIZE = 1000
+    POOL_SIZE = 1000
+    MAX_PRICE = 999
+    DATE_RANGE_DAYS = 365
+    MAX_STAY_DAYS = 14
+
+class Load(Enum):
+    DURATION = 60
+    WARMUP = 10
+    CONCURRENCY = 10
+    MIX = 'create_booking=3,get_booking_by_id=5,get_bookings_ids=1,update_booking=1,partial_update_booking=1,delete_booking=1'
+
+class Metrics(Enum):
+    PREFIX = 'ddbooking'
+    SLOWEST_CALLS = 10
+    FILE_NAME = 'request_metrics'
+
+class ReportingLevel(Enum):
+    FULL = 'full'
+    SUMMARY = 'summary'
+    OFF = 'off'
+
+class Reporting(Enum):
+    LEVEL = ReportingLevel.FULL.value
+    BUFFER_SIZE = 10000
+
+class CassetteMode(Enum):
+    RECORD = 'record'
+    REPLAY = 'replay'
+    STRICT = 'strict'
+
+class Snapshot(Enum):
+    PATH = 'bookings_snapshot'
+    VERSION = 1
+
+class RateLimits(Enum):
+    TEST = 0
+    PROD = 10
+    LOCAL = 0
+
+class Throttling(Enum):
+    BURST = 10
+    INITIAL_CONCURRENCY = 4
+    MIN_CONCURRENCY = 1
+    MAX_CONCURRENCY = 50
+    INCREASE = 1.0
+    DECREASE = 0.5
+    LATENCY_FACTOR = 3.0
+    BACKOFF_STATUSES = (429, 503)
+
+class Timing(Enum):
+    PATH = '.test_durations.json'
+    HISTORY_RUNS = 5
+    KEEP_RUNS = 6
+    FAILED_RUNS = 3
+    TREND_THRESHOLD = 0.2
+    TREND_MIN_DELTA = 0.5
+
+class Soak(Enum):
+    DURATION = 3600
+    INTERVAL = 30
+    WARMUP = 60
+    RSS_BUDGET_MB = 64
+    TRACED_BUDGET_MB = 32
+    FDS_BUDGET = 16
+    CONNECTIONS_BUDGET = 8
+    ERROR_RATE_BUDGET = 0.0
+    TOP_SITES = 10
+    FRAMES = 1
+
+class Failover(Enum):
+    PROBE_INTERVAL = 5.0
+    PROBE_TIMEOUT = 2.0
+    EWMA_ALPHA = 0.3
+    EJECT_AFTER = 3
+    EJECT_FOR = 10.0
+    MAX_EJECT_FOR = 300.0
+    FAILURE_STATUSES = (502, 503, 504)
+    MAX_PINS = 10000
@@ -1,6 +1,29 @@
+import os
+from functools import lru_cache
 from enum import Enum
 
 
 class Environment(Enum):
     TEST = 'TEST'
-    PROD = 'PROD'
\ No newline at end of file
+    PROD = 'PROD'
+    LOCAL = 'LOCAL'
+
+@lru_cache(maxsize=None)
+def load_env():
+    from dotenv import load_dotenv
+
+    return load_dotenv()
+
+def env_value(name, default, cast):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    if cast is bool:
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return cast(value)
+
+def env_statuses(name, default):
+    value = os.getenv(name)
+    if not value:
+        return tuple(default)
+    return tuple(int(status) for status in value.split(',') if status.strip())
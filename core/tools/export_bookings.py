@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import sys
+
+from requests import HTTPError
+
+from core.clients.api_client import APIClient
+from core.clients.bulk import run_bulk
+from core.data.snapshot import BookingSnapshot
+from core.settings.config import Snapshot
+
+
+def sync(client, path, full=False, recheck=True, max_workers=None, params=None):
+    previous = None
+    if not full and os.path.exists(os.path.join(path, 'meta.json')):
+        previous = BookingSnapshot.load(path)
+    previous = previous or BookingSnapshot()
+    known = previous.index()
+    ids = list(client.iter_bookings_ids(params))
+    # without recheck only ids missing from the snapshot are fetched
+    to_fetch = [booking_id for booking_id in ids if recheck or booking_id not in known]
+    stats = {'listed': len(ids), 'new': 0, 'refreshed': 0, 'not_modified': 0, 'deleted': 0, 'failed': []}
+
+    def fetch(booking_id):
+        return client.get_booking_if_changed(booking_id, previous.etags.get(booking_id))
+
+    changed, etags, gone = {}, {}, set()
+    for result in run_bulk(fetch, to_fetch, client.policy.workers_for(max_workers)):
+        booking_id = result.item
+        if not result.ok:
+            if isinstance(result.error, HTTPError) and result.error.response is not None and result.error.response.status_code == 404:
+                gone.add(booking_id)
+            else:
+                stats['failed'].append(booking_id)
+            continue
+        booking, etag = result.result
+        etags[booking_id] = etag
+        if booking is None:
+            stats['not_modified'] += 1
+            continue
+        changed[booking_id] = booking
+        stats['refreshed' if booking_id in known else 'new'] += 1
+
+    alive = {booking_id for booking_id in ids if booking_id not in gone and (booking_id in known or booking_id in changed)}
+    stats['deleted'] = len(set(known) - alive)
+    snapshot = previous.merge(alive, changed, etags)
+    previous.close()
+    return snapshot.save(path), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export all bookings into a columnar snapshot for offline analysis')
+    parser.add_argument('--path', default=os.getenv('BOOKINGS_SNAPSHOT_PATH') or Snapshot.PATH.value)
+    parser.add_argument('--full', action='store_true', help='ignore the existing snapshot and fetch everything')
+    parser.add_argument('--new-only', action='store_true', help='do not recheck bookings already in the snapshot')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--summary', action='store_true', help='print aggregates of the synced snapshot')
+    args = parser.parse_args(argv)
+
+    client = APIClient()
+    snapshot, stats = sync(client, args.path, args.full, not args.new_only, args.workers)
+    print(f'Synced {len(snapshot)} bookings into {args.path}: {stats["new"]} new, {stats["refreshed"]} refreshed, '
+          f'{stats["not_modified"]} not modified, {stats["deleted"]} deleted')
+    if args.summary:
+        print(json.dumps(snapshot.summary(), indent=2))
+    if stats['failed']:
+        print(f'Failed to fetch {len(stats["failed"])} bookings: {stats["failed"][:20]}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
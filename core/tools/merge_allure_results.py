@@ -0,0 +1,48 @@
+import argparse
+import os
+import shutil
+import sys
+
+
+MERGED_FILES = ('environment.properties',)
+
+
+def merge_allure_results(sources, target) -> int:
+    os.makedirs(target, exist_ok=True)
+    copied = 0
+    merged_lines = {name: [] for name in MERGED_FILES}
+    for source in sources:
+        if not os.path.isdir(source):
+            continue
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if not os.path.isfile(path):
+                continue
+            if name in merged_lines:
+                with open(path) as file:
+                    merged_lines[name].extend(line for line in file.read().splitlines() if line not in merged_lines[name])
+                continue
+            destination = os.path.join(target, name)
+            if os.path.exists(destination):
+                continue
+            shutil.copy2(path, destination)
+            copied += 1
+    for name, lines in merged_lines.items():
+        if lines:
+            with open(os.path.join(target, name), 'w') as file:
+                file.write('\n'.join(lines) + '\n')
+    return copied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge allure result directories from several shards')
+    parser.add_argument('sources', nargs='+', help='allure-results directories of the shards')
+    parser.add_argument('--output', default='allure-results')
+    args = parser.parse_args(argv)
+    copied = merge_allure_results(args.sources, args.output)
+    print(f'Merged {copied} files into {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
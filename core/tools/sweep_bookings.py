@@ -0,0 +1,49 @@
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from core.clients.api_client import APIClient
+from core.data.namespace import parse_run_tag
+
+
+def find_orphans(client, older_than=timedelta(hours=1), exclude_runs=(), params=None, prefetch=16):
+    cutoff = datetime.now(timezone.utc) - older_than
+    for result in client.iter_bookings(params=params, prefetch=prefetch):
+        if not result.ok:
+            continue
+        tag = parse_run_tag(result.result.get('lastname'))
+        if tag is None or tag['run_id'] in exclude_runs or tag['started'] > cutoff:
+            continue
+        yield result.item, tag
+
+
+def sweep(client, older_than=timedelta(hours=1), exclude_runs=(), dry_run=False, max_workers=None, params=None):
+    orphans = dict(find_orphans(client, older_than, exclude_runs, params))
+    if dry_run or not orphans:
+        return orphans, []
+    results = client.delete_bookings_bulk(orphans, max_workers=max_workers)
+    return orphans, [result.item for result in results if not result.ok]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Delete bookings left behind by earlier test runs')
+    parser.add_argument('--older-than', type=float, default=1.0, help='only sweep runs started this many hours ago')
+    parser.add_argument('--exclude-run', action='append', default=[], help='run id to keep, may be repeated')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    client = APIClient()
+    client.auth()
+    orphans, failed = sweep(client, timedelta(hours=args.older_than), set(args.exclude_run), args.dry_run, args.workers)
+    runs = sorted({tag['run_id'] for tag in orphans.values()})
+    action = 'Found' if args.dry_run else 'Deleted'
+    print(f'{action} {len(orphans) - len(failed)} orphaned bookings from {len(runs)} runs')
+    if failed:
+        print(f'Failed to delete {len(failed)} bookings: {failed[:20]}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
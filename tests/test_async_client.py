@@ -0,0 +1,50 @@
+import allure
+import pytest
+
+from core.models.booking import BookingResponse
+
+
+@allure.feature('Test async client')
+@allure.story('Positive: ping with async client')
+@pytest.mark.asyncio
+async def test_async_ping(async_api_client):
+    status_code = await async_api_client.ping()
+    assert status_code == 201, f'Expected status code 201 but got {status_code}'
+
+@allure.feature('Test async client')
+@allure.story('Positive: creating and getting booking with async client')
+@pytest.mark.asyncio
+async def test_async_create_and_get_booking(async_api_client, generate_random_booking_data):
+    booking_data = generate_random_booking_data
+    response = await async_api_client.create_booking(booking_data)
+    BookingResponse(**response)
+
+    booking = await async_api_client.get_booking_by_id(response['bookingid'])
+    assert booking['firstname'] == booking_data['firstname']
+    assert booking['lastname'] == booking_data['lastname']
+
+@allure.feature('Test async client')
+@allure.story('Positive: creating bookings concurrently with bounded gather')
+@pytest.mark.asyncio
+async def test_async_gather_create_bookings(async_api_client, generate_random_booking_data):
+    responses = await async_api_client.gather(
+        *(async_api_client.create_booking(generate_random_booking_data) for _ in range(10)),
+        limit=5
+    )
+    assert len(responses) == 10
+    assert len({response['bookingid'] for response in responses}) == 10
+    for response in responses:
+        BookingResponse(**response)
+
+@allure.feature('Test async client')
+@allure.story('Writes after auth send the token cookie')
+@pytest.mark.asyncio
+async def test_async_writes_use_token(async_api_client, generate_random_booking_data, mocker):
+    booking_id = (await async_api_client.create_booking(generate_random_booking_data))['bookingid']
+    await async_api_client.auth()
+    spy = mocker.spy(async_api_client.session, 'patch')
+    booking = await async_api_client.partial_update_booking(booking_id, {'firstname': 'Cookie'})
+    assert booking['firstname'] == 'Cookie'
+    assert spy.call_args.kwargs['headers'] == {'Cookie': f'token={async_api_client.token}'}
+    assert 'auth' not in spy.call_args.kwargs
+    assert await async_api_client.delete_booking(booking_id)
@@ -0,0 +1,152 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import pytest
+import requests
+
+from core.clients.api_client import APIClient
+from core.clients.backends import BackendPool, booking_id_of, split_urls
+from core.clients.transport import TransportPolicy
+from core.server.booking_server import BookingServer
+
+
+def _pool(clock, **kwargs):
+    return BackendPool(['http://a', 'http://b', 'http://c'], probe=lambda url: None, clock=clock, **kwargs)
+
+@allure.feature('Test backend pool')
+@allure.story('Requests go to the fastest healthy backend')
+def test_routes_to_fastest(fake_clock):
+    pool = _pool(fake_clock)
+    a, b, c = pool.backends
+    assert pool.route('http://a/booking')[0] == 'http://a/booking'
+    pool.record_success(a, 0.3)
+    pool.record_success(b, 0.1)
+    pool.record_success(c, 0.2)
+    assert pool.route('http://a/booking?lastname=X')[0] == 'http://b/booking?lastname=X'
+    pool.record_success(b, 1.0)
+    assert b.latency == pytest.approx(0.37)
+    assert pool.route('http://a/ping')[1] is c
+    assert pool.route('http://elsewhere/ping') == ('http://elsewhere/ping', None)
+    assert split_urls('http://a/, http://b') == ['http://a', 'http://b']
+    assert booking_id_of('http://a/booking/12') == 12 and booking_id_of('http://a/booking') is None
+
+@allure.feature('Test backend pool')
+@allure.story('Failing backends are ejected and readmitted after a successful probe')
+def test_ejection_and_readmission(fake_clock):
+    probes = {'http://a': True, 'http://b': True, 'http://c': True}
+
+    def probe(url):
+        if not probes[url]:
+            raise ConnectionError(url)
+
+    pool = BackendPool(list(probes), probe=probe, eject_after=2, eject_for=10, clock=fake_clock)
+    a, b, c = pool.backends
+    pool.probe_all()
+    probes['http://a'] = False
+    pool.probe_all()
+    assert pool.stats()['http://a']['healthy']
+    pool.probe_all()
+    assert not pool.stats()['http://a']['healthy'] and pool.stats()['http://a']['ejected_for'] == 10
+    assert all(pool.route('http://a/booking')[1] is not a for _ in range(5))
+
+    fake_clock.now = 11
+    assert pool.route('http://a/booking')[1] is not a
+    pool.probe_all()
+    assert pool.stats()['http://a']['ejected_for'] == 20
+    probes['http://a'] = True
+    fake_clock.now = 32
+    assert not pool.stats()['http://a']['healthy'] and pool.route('http://a/booking')[1] is not a
+    pool.probe_all()
+    assert pool.stats()['http://a']['healthy'] and pool.stats()['http://a']['failures'] == 0
+    pool.record_failure(a)
+    assert pool.stats()['http://a']['healthy']
+
+    for backend in pool.backends:
+        for _ in range(2):
+            pool.record_failure(backend)
+    assert pool.route('http://a/ping')[1] is b
+
+@allure.feature('Test backend pool')
+@allure.story('Shared pools stop their probe threads')
+def test_shared_pool_stops():
+    pool = BackendPool.shared(['http://127.0.0.1:9'])
+    assert BackendPool.shared(['http://127.0.0.1:9']) is pool and pool._thread.is_alive()
+    thread = pool._thread
+    BackendPool.stop_shared()
+    assert not thread.is_alive() and pool._thread is None and BackendPool._shared == {}
+
+@allure.feature('Test backend pool')
+@allure.story('Writes on a booking stick to the backend that created it')
+def test_sticky_writes(fake_clock):
+    pool = _pool(fake_clock, eject_after=1)
+    a, b, c = pool.backends
+    pool.record_success(c, 0.1)
+    pool.pin(7, 'http://c/booking')
+    pool.record_success(a, 0.01)
+    assert pool.route('http://a/booking/7', 'put')[1] is c
+    assert pool.route('http://a/booking/7', 'get')[1] is a
+    pool.record_failure(c)
+    assert pool.route('http://a/booking/7', 'patch')[1] is a
+    assert pool.pinned(7) == 'http://a'
+    pool.unpin(7)
+    assert pool.pinned(7) is None
+
+    pool.max_pins = 2
+    for booking_id in (1, 2):
+        pool.pin(booking_id, 'http://b/booking')
+    pool.route('http://a/booking/1', 'put')
+    pool.pin(3, 'http://c/booking')
+    assert pool.pinned(2) is None and pool.pinned(1) == 'http://b' and pool.pinned(3) == 'http://c'
+
+@allure.feature('Test backend pool')
+@allure.story('Client fails over between replicas and keeps writes sticky')
+def test_client_failover(local_booking_server, api_client, generate_random_booking_data):
+    with BookingServer(store=local_booking_server.store) as replica:
+        replica.tokens = local_booking_server.tokens
+        latencies = {local_booking_server.url: 0.2, replica.url: 0.1}
+        pool = BackendPool([local_booking_server.url, replica.url], eject_after=1)
+        pool.probe = lambda url: None
+        for backend in pool.backends:
+            pool.record_success(backend, latencies[backend.url])
+        client = APIClient(backends=pool)
+        client.session.headers.update(api_client.session.headers)
+
+        booking_id = client.create_booking(generate_random_booking_data)['bookingid']
+        assert pool.pinned(booking_id) == replica.url
+        pool.backends[0].latency = 0.01
+        client.partial_update_booking(booking_id, {'firstname': 'Sticky'})
+        assert client.get_booking_by_id(booking_id)['firstname'] == 'Sticky'
+        assert pool.stats()[replica.url]['requests'] == 2
+
+    pool.probe = pool._ping
+    pool.probe_all()
+    assert not pool.stats()[replica.url]['healthy']
+    assert client.delete_booking(booking_id)
+    assert pool.pinned(booking_id) is None
+    assert pool.stats()[replica.url]['requests'] == 2
+
+@allure.feature('Test backend pool')
+@allure.story('Failures of one backend open only its circuit breaker')
+def test_circuit_breaker_per_backend(mocker):
+    pool = BackendPool(['http://a', 'http://b'], probe=lambda url: None, eject_after=2)
+    a, b = pool.backends
+    pool.record_success(a, 0.01)
+    pool.record_success(b, 0.1)
+    client = APIClient(policy=TransportPolicy(failure_threshold=3, reset_timeout=60), backends=pool)
+    in_flight = threading.Barrier(3)
+    ok = mocker.Mock(status_code=201, headers={}, content=b'Created')
+
+    def get(url, **kwargs):
+        if url.startswith(a.url):
+            # calls already sent to the failing host fail together, after it has been chosen three times
+            in_flight.wait()
+            raise requests.ConnectionError(url)
+        return ok
+
+    client.session.get = get
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        failures = [executor.submit(client.ping) for _ in range(3)]
+    assert all(isinstance(future.exception(), requests.ConnectionError) for future in failures)
+    assert client.circuit_breaker.state == 'open' and not pool.stats()['http://a']['healthy']
+    assert client.ping() == 201
@@ -0,0 +1,58 @@
+import allure
+import pytest
+
+from datetime import date
+from itertools import islice
+
+from core.data.booking_factory import BookingFactory, EDGE_CASES
+from core.models.booking import Booking
+
+
+@allure.feature('Test booking factory')
+@allure.story('Same seed produces same payloads')
+def test_factory_is_reproducible():
+    first = BookingFactory(seed=42, pool_size=50, start_date=date(2025, 1, 1))
+    second = BookingFactory(seed=42, pool_size=50, start_date=date(2025, 1, 1))
+    assert first.batch(50) == second.batch(50)
+    assert BookingFactory(seed=43, pool_size=50, start_date=date(2025, 1, 1)).batch(50) != BookingFactory(seed=42, pool_size=50, start_date=date(2025, 1, 1)).batch(50)
+
+@allure.feature('Test booking factory')
+@allure.story('Generated payloads are valid bookings')
+def test_factory_payloads_are_valid():
+    for booking in BookingFactory(seed=1, pool_size=50).batch(200):
+        Booking(**booking)
+        assert booking['bookingdates']['checkin'] < booking['bookingdates']['checkout']
+
+@allure.feature('Test booking factory')
+@allure.story('Edge shapes used by the tests')
+@pytest.mark.parametrize('edge_case', sorted(EDGE_CASES))
+def test_factory_edge_cases(edge_case):
+    booking = BookingFactory(seed=1, pool_size=50).booking(edge_case=edge_case)
+    Booking(**booking)
+    if edge_case == 'zero_price':
+        assert booking['totalprice'] == 0
+    elif edge_case == 'huge_price':
+        assert booking['totalprice'] == 10**10
+    elif edge_case == 'same_day':
+        assert booking['bookingdates']['checkin'] == booking['bookingdates']['checkout']
+    elif edge_case == 'special_characters':
+        assert booking['firstname'] == '=!@#$%^&*()_+'
+    else:
+        assert 'additionalneeds' not in booking
+
+@allure.feature('Test booking factory')
+@allure.story('Streaming produces payloads lazily in batches')
+def test_factory_stream():
+    factory = BookingFactory(seed=1, pool_size=50, batch_size=10)
+    assert len(list(factory.stream(25))) == 25
+    payloads = list(islice(BookingFactory(seed=1, pool_size=50, batch_size=10).stream(), 15))
+    assert len(payloads) == 15
+    with pytest.raises(ValueError):
+        next(factory.stream(edge_case='unknown'))
+
+@allure.feature('Test booking factory')
+@allure.story('Fixture payloads are fresh objects')
+def test_fixture_payloads_are_independent(booking_factory):
+    first, second = booking_factory.booking(), booking_factory.booking()
+    first['bookingdates']['checkin'] = 'changed'
+    assert second['bookingdates']['checkin'] != 'changed'
@@ -0,0 +1,77 @@
+import allure
+import pytest
+
+from core.clients.api_client import APIClient
+from core.clients.booking_index import BookingIndex
+from core.settings.environment import Environment
+
+
+def _booking(firstname, lastname, checkin, checkout):
+    return {'firstname': firstname, 'lastname': lastname, 'bookingdates': {'checkin': checkin, 'checkout': checkout}}
+
+@pytest.fixture()
+def indexed_client(api_client):
+    client = APIClient(index=BookingIndex())
+    client.session.headers.update(api_client.session.headers)
+    return client
+
+@allure.feature('Test query index')
+@allure.story('Hash and interval indexes answer the server filters')
+def test_index_filters(fake_clock):
+    index = BookingIndex(clock=fake_clock).build([
+        (1, _booking('Ann', 'Lee', '2030-01-01', '2030-01-05')),
+        (2, _booking('Bob', 'Lee', '2030-02-01', '2030-02-03')),
+        (3, _booking('Ann', 'Kim', '2030-03-01', '2030-03-10')),
+    ])
+    ids = lambda params: [item['bookingid'] for item in index.query(params)]
+    assert ids(None) == [1, 2, 3]
+    assert ids({'firstname': 'Ann'}) == [1, 3]
+    assert ids({'lastname': 'Lee', 'checkin': '2030-01-15'}) == [2]
+    assert ids({'checkin': '2030-02-01', 'checkout': '2030-03-01'}) == [3]
+    assert ids({'firstname': 'Nobody'}) == []
+
+    index.put(2, _booking('Bob', 'Kim', '2030-04-01', '2030-04-02'))
+    index.remove(3)
+    assert ids({'lastname': 'Kim'}) == [2]
+    assert ids({'checkin': '2030-02-01'}) == [2]
+    assert index.query({'checkin': '01.02.2030'}) is None
+    assert index.query({'checkin': '2030-02-01'}, date_filters=False) is None
+    assert index.query({'totalprice': 10}) is None
+
+@allure.feature('Test query index')
+@allure.story('A stale index declines queries and keeps client writes made during a refresh')
+def test_index_staleness(fake_clock):
+    index = BookingIndex(max_age=60, clock=fake_clock)
+    assert index.stale and index.query({'firstname': 'Ann'}) is None
+
+    index._pending = []
+    index.put(7, _booking('Ann', 'New', '2030-01-01', '2030-01-02'))
+    index.build([(7, _booking('Ann', 'Old', '2030-01-01', '2030-01-02'))])
+    assert index.query({'lastname': 'New'}) == [{'bookingid': 7}]
+
+    fake_clock.now = 61
+    assert index.query({'lastname': 'New'}) is None
+    assert index.stats()['stale'] and index.stats()['misses'] == 2
+
+@allure.feature('Test query index')
+@allure.story('Client writes keep the index current and reads skip the server')
+def test_client_uses_index(indexed_client, generate_random_booking_data):
+    # a refresh would fetch every booking on the server; a seeded dataset plus the client's own writes is enough here
+    # other tests of the run may still hold bookings with the same generated lastname
+    booking = dict(generate_random_booking_data, lastname=f"{generate_random_booking_data['lastname']}-indexed")
+    lastname = booking['lastname']
+    indexed_client.index.build([(0, _booking('Seeded', lastname, '2000-01-01', '2000-01-02'))])
+    booking_id = indexed_client.create_booking(booking)['bookingid']
+    assert indexed_client.get_bookings_ids(params={'lastname': lastname}) == [{'bookingid': 0}, {'bookingid': booking_id}]
+    indexed_client.index.remove(0)
+    params = {'lastname': lastname, 'checkin': booking['bookingdates']['checkin']}
+    assert indexed_client.get_bookings_ids(params=params, use_cache=False) == [{'bookingid': booking_id}]
+    assert indexed_client.get_bookings_ids(params=params) == [{'bookingid': booking_id}]
+
+    indexed_client.partial_update_booking(booking_id, {'lastname': f'{lastname}-moved'})
+    assert indexed_client.get_bookings_ids(params=params) == []
+    assert indexed_client.get_bookings_ids(params={'lastname': f'{lastname}-moved'}) == [{'bookingid': booking_id}]
+    indexed_client.delete_booking(booking_id)
+    assert indexed_client.get_bookings_ids(params={'lastname': f'{lastname}-moved'}) == []
+    # outside LOCAL the two date-filtered reads go to the server
+    assert indexed_client.index.stats()['hits'] == (5 if indexed_client.environment is Environment.LOCAL else 3)
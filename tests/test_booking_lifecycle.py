@@ -0,0 +1,75 @@
+import allure
+import pytest
+
+from requests import HTTPError
+
+from core.models.booking import Booking
+from core.server.booking_server import BookingValidationError, _parse_price
+
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Positive: getting created booking by id')
+def test_get_booking_by_id(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    response = api_client.get_booking_by_id(booking_id)
+    Booking(**response)
+    assert response['firstname'] == generate_random_booking_data['firstname']
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Positive: filtering bookings by name')
+def test_get_bookings_ids_by_name(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    params = {
+        'firstname': generate_random_booking_data['firstname'],
+        'lastname': generate_random_booking_data['lastname']
+    }
+    response = api_client.get_bookings_ids(params=params)
+    assert {'bookingid': booking_id} in response
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Positive: updating booking')
+def test_update_booking(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    booking_data = dict(generate_random_booking_data, firstname='Updated', totalprice=321)
+    response = api_client.update_booking(booking_id, booking_data)
+    assert response['firstname'] == 'Updated'
+    assert response['totalprice'] == 321
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Positive: partially updating booking')
+def test_partial_update_booking(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    response = api_client.partial_update_booking(booking_id, {'lastname': 'Patched'})
+    assert response['lastname'] == 'Patched'
+    assert response['firstname'] == generate_random_booking_data['firstname']
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Positive: deleting booking')
+def test_delete_booking(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    assert api_client.delete_booking(booking_id)
+    with pytest.raises(HTTPError) as exc_info:
+        api_client.get_booking_by_id(booking_id)
+    assert exc_info.value.response.status_code == 404
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Negative: getting not existing booking')
+def test_get_not_existing_booking(api_client):
+    with pytest.raises(HTTPError) as exc_info:
+        api_client.get_booking_by_id(10**9)
+    assert exc_info.value.response.status_code == 404
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Negative: updating booking without authorization')
+def test_update_booking_without_auth(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    url = f'{api_client.base_url}/booking/{booking_id}'
+    response = api_client.session.put(url, json=generate_random_booking_data)
+    assert response.status_code == 403
+
+@allure.feature('Test booking lifecycle')
+@allure.story('Negative: local server rejects prices without an integer value')
+@pytest.mark.parametrize('price', [float('inf'), float('-inf'), float('nan'), 'Infinity', 'NaN', 'abc', True])
+def test_invalid_price_rejected(price):
+    with pytest.raises(BookingValidationError):
+        _parse_price(price)
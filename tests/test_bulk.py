@@ -0,0 +1,61 @@
+import allure
+import threading
+import time
+
+from core.clients.bulk import run_bulk
+
+
+@allure.feature('Test bulk operations')
+@allure.story('Results keep input order')
+def test_run_bulk_keeps_order():
+    def slow_echo(item):
+        time.sleep(0.001 * (10 - item))
+        return item * 2
+    results = list(run_bulk(slow_echo, range(10), max_workers=4))
+    assert [result.index for result in results] == list(range(10))
+    assert [result.result for result in results] == [item * 2 for item in range(10)]
+
+@allure.feature('Test bulk operations')
+@allure.story('Errors are collected per item')
+def test_run_bulk_collects_errors():
+    def fail_on_odd(item):
+        if item % 2:
+            raise ValueError(f'odd {item}')
+        return item
+    results = list(run_bulk(fail_on_odd, range(6), max_workers=3))
+    assert [result.ok for result in results] == [True, False, True, False, True, False]
+    assert str(results[1].error) == 'odd 1'
+
+@allure.feature('Test bulk operations')
+@allure.story('Streaming input is consumed lazily')
+def test_run_bulk_streams_input():
+    consumed = []
+    def items():
+        for item in range(100):
+            consumed.append(item)
+            yield item
+    results = run_bulk(lambda item: item, items(), max_workers=2, window=4)
+    first = next(results)
+    assert first.result == 0
+    assert len(consumed) <= 5
+    assert sum(1 for _ in results) == 99
+
+@allure.feature('Test bulk operations')
+@allure.story('Bulk methods fan out over the client methods')
+def test_delete_bookings_bulk(offline_client, mocker):
+    seen_threads = set()
+    def delete_booking(booking_id):
+        seen_threads.add(threading.current_thread().name)
+        if booking_id == 3:
+            raise ValueError('not found')
+        return True
+    mocker.patch.object(offline_client, 'delete_booking', side_effect=delete_booking)
+    results = offline_client.delete_bookings_bulk(range(1, 6), max_workers=4)
+    assert [result.item for result in results] == [1, 2, 3, 4, 5]
+    assert [result.ok for result in results] == [True, True, False, True, True]
+    assert all(name.startswith('bulk') for name in seen_threads)
+
+@allure.feature('Test bulk operations')
+@allure.story('Worker pool never exceeds the connection pool')
+def test_bulk_workers_capped_by_pool(offline_client):
+    assert offline_client.policy.workers_for(10**6) == offline_client.policy.pool_maxsize
@@ -0,0 +1,64 @@
+import allure
+import pytest
+
+from core.clients.api_client import APIClient
+from core.clients.cache import BookingCache, MISSING
+
+
+@pytest.fixture()
+def cached_client(api_client):
+    client = APIClient(cache=BookingCache(max_size=8, ttl=60))
+    client.session.headers.update(api_client.session.headers)
+    yield client
+    # bookings created here are recorded in this client's registry, which no shared fixture tears down
+    client.registry.teardown(client)
+
+@allure.feature('Test booking cache')
+@allure.story('LRU eviction and TTL expiry')
+def test_cache_lru_and_ttl(fake_clock):
+    cache = BookingCache(max_size=2, ttl=10, clock=fake_clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is MISSING
+    fake_clock.now = 11
+    assert cache.get('a') is MISSING
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['hits'] == 1
+
+@allure.feature('Test booking cache')
+@allure.story('Cached values are isolated from callers')
+def test_cache_returns_copies():
+    cache = BookingCache()
+    cache.set('a', {'firstname': 'Jim'})
+    cache.get('a')['firstname'] = 'Changed'
+    assert cache.get('a') == {'firstname': 'Jim'}
+
+@allure.feature('Test booking cache')
+@allure.story('Repeated reads are served from cache')
+def test_get_booking_by_id_hits_cache(cached_client, generate_random_booking_data, mocker):
+    booking_id = cached_client.create_booking(generate_random_booking_data)['bookingid']
+    spy = mocker.spy(cached_client.session, 'get')
+    first = cached_client.get_booking_by_id(booking_id)
+    second = cached_client.get_booking_by_id(booking_id)
+    assert first == second
+    assert spy.call_count == 0
+    cached_client.get_booking_by_id(booking_id, use_cache=False)
+    assert spy.call_count == 1
+
+@allure.feature('Test booking cache')
+@allure.story('Writes refresh and invalidate cached entries')
+def test_writes_invalidate_cache(cached_client, generate_random_booking_data):
+    params = {'firstname': generate_random_booking_data['firstname'], 'lastname': generate_random_booking_data['lastname']}
+    cached_client.get_bookings_ids(params=params)
+    booking_id = cached_client.create_booking(generate_random_booking_data)['bookingid']
+    assert {'bookingid': booking_id} in cached_client.get_bookings_ids(params=params)
+
+    cached_client.partial_update_booking(booking_id, {'totalprice': 777})
+    assert cached_client.get_booking_by_id(booking_id)['totalprice'] == 777
+
+    cached_client.delete_booking(booking_id)
+    assert cached_client.cache.get(BookingCache.booking_key(booking_id)) is MISSING
+    assert {'bookingid': booking_id} not in cached_client.get_bookings_ids(params=params)
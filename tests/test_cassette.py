@@ -0,0 +1,87 @@
+import allure
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from datetime import date, timedelta
+
+from core.clients.api_client import APIClient
+from core.clients.cassette import Cassette, CassetteMissError
+from core.data.namespace import run_id, run_tag
+from core.settings.config import CassetteMode
+
+
+@pytest.fixture()
+def recording(local_booking_server, tmp_path):
+    if local_booking_server is None:
+        pytest.skip('recording needs the local booking server')
+    return tmp_path / 'cassette.json.gz'
+
+def client_with(cassette, api_client):
+    client = APIClient(cassette=cassette)
+    client.session.headers.update(api_client.session.headers)
+    return client
+
+@allure.feature('Test cassette transport')
+@allure.story('Recorded interactions replay without the service')
+def test_record_and_replay(api_client, recording, booking_registry, generate_random_booking_data, monkeypatch):
+    recorder = client_with(Cassette(str(recording), CassetteMode.RECORD), api_client)
+    created = recorder.create_booking(generate_random_booking_data)
+    booking_id = created['bookingid']
+    booking_registry.record(booking_id)
+    assert recorder.get_booking_by_id(booking_id) == generate_random_booking_data
+    _, etag = recorder.get_booking_if_changed(booking_id)
+    recorder.cassette.save()
+
+    monkeypatch.setenv('LOCAL_BASE_URL', 'http://127.0.0.1:9')
+    replayer = client_with(Cassette(str(recording), CassetteMode.STRICT), api_client)
+    assert replayer.create_booking(generate_random_booking_data) == created
+    assert replayer.get_booking_by_id(booking_id) == generate_random_booking_data
+    assert etag and replayer.get_booking_if_changed(booking_id) == (generate_random_booking_data, etag)
+    with pytest.raises(CassetteMissError):
+        replayer.get_booking_by_id(booking_id + 1)
+
+@allure.feature('Test cassette transport')
+@allure.story('Run tags and dates are stored relative to the recording')
+def test_normalization_round_trip(tmp_path):
+    today = date(2026, 1, 1)
+    cassette = Cassette(str(tmp_path / 'cassette.json.gz'), CassetteMode.RECORD, today=today)
+    text = f'{{"lastname":"Smith-{run_tag()}","other":"{run_id()}","checkin":"2026-01-11","bad":"2026-13-40"}}'
+    normalized = cassette.normalize(text)
+    assert normalized == '{"lastname":"Smith-<tag>","other":"<run>","checkin":"<date+10>","bad":"2026-13-40"}'
+    later = Cassette(str(tmp_path / 'missing.json.gz'), CassetteMode.REPLAY, today=today + timedelta(days=3))
+    assert '"checkin":"2026-01-14"' in later.denormalize(normalized)
+
+@allure.feature('Test cassette transport')
+@allure.story('Keys do not depend on the session authorization header')
+def test_key_ignores_session_authorization(tmp_path):
+    cassette = Cassette(str(tmp_path / 'cassette.json.gz'), CassetteMode.RECORD)
+    session = requests.Session()
+    before = session.prepare_request(requests.Request('GET', 'http://host/booking/1'))
+    session.headers['Authorization'] = 'Bearer abc'
+    after = session.prepare_request(requests.Request('GET', 'http://host/booking/1'))
+    cookie = session.prepare_request(requests.Request('PUT', 'http://host/booking/1', headers={'Cookie': 'token=abc'}))
+    assert cassette.key(before) == cassette.key(after) == 'GET /booking/1 anonymous -'
+    assert cassette.key(cookie) == 'PUT /booking/1 cookie -'
+
+@allure.feature('Test cassette transport')
+@allure.story('Headers the clients act on are replayed')
+def test_replayed_headers(tmp_path):
+    path = str(tmp_path / 'cassette.json.gz')
+    request = requests.Request('GET', 'http://host/booking/1').prepare()
+    response = requests.Response()
+    response.status_code = 429
+    response.headers = CaseInsensitiveDict({'Retry-After': '2', 'ETag': 'W/"1"', 'Date': 'Thu, 01 Jan 2026 00:00:00 GMT'})
+    response._content = b''
+    recorder = Cassette(path, CassetteMode.RECORD)
+    recorder.record(recorder.keys(request), response)
+    recorder.save()
+    replayer = Cassette(path, CassetteMode.STRICT)
+    replayed = replayer.build_response(request, replayer.play(replayer.keys(request)))
+    assert replayed.status_code == 429 and dict(replayed.headers) == {'ETag': 'W/"1"', 'Retry-After': '2'}
+
+@allure.feature('Test cassette transport')
+@allure.story('Strict mode needs an existing cassette')
+def test_strict_mode_requires_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / 'missing.json.gz'), CassetteMode.STRICT)
@@ -0,0 +1,69 @@
+import json
+
+import allure
+import pytest
+
+from core.clients.api_client import APIClient
+from core.metrics.instrumentation import RequestMetrics, CallRecord
+
+
+@pytest.fixture()
+def metrics():
+    return RequestMetrics(slowest=2)
+
+@pytest.fixture()
+def instrumented_client(api_client, metrics):
+    client = APIClient(metrics=metrics)
+    client.session.headers.update(api_client.session.headers)
+    yield client
+    # bookings created here are recorded in this client's registry, which no shared fixture tears down
+    client.registry.teardown(client)
+
+@allure.feature('Test request instrumentation')
+@allure.story('Calls are aggregated per endpoint')
+def test_metrics_per_endpoint(instrumented_client, metrics, generate_random_booking_data):
+    booking_id = instrumented_client.create_booking(generate_random_booking_data)['bookingid']
+    instrumented_client.get_booking_by_id(booking_id)
+    instrumented_client.ping()
+    summary = metrics.summary()
+    assert set(summary) == {'BOOKING_ENDPOINT', 'PING_ENDPOINT'}
+    booking = summary['BOOKING_ENDPOINT']
+    assert booking['calls'] == 2
+    assert booking['statuses'] == {'200': 2}
+    assert booking['request_bytes'] > 0
+    assert booking['response_bytes'] > 0
+    if instrumented_client.cassette is None:
+        assert booking['connect']['max'] > 0
+    assert booking['ttfb']['p50'] <= booking['total']['p50']
+    assert summary['PING_ENDPOINT']['statuses'] == {'201': 1}
+
+@allure.feature('Test request instrumentation')
+@allure.story('Failed calls are counted as errors')
+def test_metrics_record_errors(instrumented_client, metrics, mocker):
+    mocker.patch.object(instrumented_client.session, 'get', side_effect=ConnectionError('down'))
+    with pytest.raises(ConnectionError):
+        instrumented_client.ping()
+    assert metrics.summary()['PING_ENDPOINT']['statuses'] == {'error': 1}
+
+@allure.feature('Test request instrumentation')
+@allure.story('Slowest calls are kept per test')
+def test_metrics_slowest_calls(metrics):
+    for total in (0.3, 0.1, 0.5):
+        metrics.observe(CallRecord('BOOKING_ENDPOINT', 'GET', test='test_a', status=200, total=total))
+    metrics.observe(CallRecord('BOOKING_ENDPOINT', 'GET', test='test_b', status=200, total=1.0))
+    assert [call.total for call in metrics.pop_slowest('test_a')] == [0.5, 0.3]
+    assert metrics.slowest('test_a') == []
+    assert len(metrics.slowest('test_b')) == 1
+
+@allure.feature('Test request instrumentation')
+@allure.story('Metrics are exported as Prometheus text and JSON')
+def test_metrics_export(metrics, tmp_path):
+    metrics.observe(CallRecord('AUTH_ENDPOINT', 'POST', status=200, total=0.25, request_bytes=40, response_bytes=30))
+    metrics.write_prometheus(tmp_path / 'metrics.prom', {'worker': 'gw0'})
+    metrics.write_json(tmp_path / 'metrics.json')
+    text = (tmp_path / 'metrics.prom').read_text()
+    assert 'ddbooking_request_duration_seconds_count{endpoint="AUTH_ENDPOINT",phase="total",worker="gw0"} 1' in text
+    assert 'ddbooking_responses_total{endpoint="AUTH_ENDPOINT",status="200",worker="gw0"} 1' in text
+    assert 'ddbooking_request_bytes_total{endpoint="AUTH_ENDPOINT",direction="sent",worker="gw0"} 40' in text
+    summary = json.loads((tmp_path / 'metrics.json').read_text())
+    assert summary['AUTH_ENDPOINT']['total']['max'] == pytest.approx(0.25, rel=0.01)
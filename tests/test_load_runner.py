@@ -0,0 +1,60 @@
+import allure
+import pytest
+
+from core.load.runner import LoadRunner, Scenario, compare, main, parse_mix
+from core.metrics.histogram import LatencyHistogram
+from core.reporting import steps
+
+
+@allure.feature('Test load runner')
+@allure.story('Histogram percentiles stay within precision')
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    assert histogram.count == 10000
+    assert histogram.max == 10000
+    for percentile, expected in ((50, 5000), (95, 9500), (99, 9900)):
+        assert abs(histogram.percentile(percentile) - expected) <= expected * 0.01
+
+@allure.feature('Test load runner')
+@allure.story('Mix parsing rejects unknown operations')
+def test_parse_mix():
+    assert parse_mix('ping=1,create_booking=3') == {'ping': 1.0, 'create_booking': 3.0}
+    with pytest.raises(ValueError):
+        parse_mix('drop_database=1')
+
+@allure.feature('Test load runner')
+@allure.story('Closed loop run reports every endpoint')
+def test_closed_loop_report(mocker):
+    client = mocker.Mock()
+    client.base_url = 'http://localhost'
+    client.create_booking.return_value = {'bookingid': 1}
+    client.get_booking_by_id.side_effect = [ValueError('boom')] + [{}] * 10**6
+    scenario = Scenario(client, parse_mix('ping=1,create_booking=1,get_booking_by_id=1'), seed=1)
+    report = LoadRunner(scenario, duration=0.2, warmup=0.05, concurrency=2).run()
+    assert set(report['endpoints']) == {'PING_ENDPOINT', 'BOOKING_ENDPOINT'}
+    assert report['total']['count'] > 0
+    assert report['total']['latency_ms']['p99'] <= report['total']['latency_ms']['max']
+
+@allure.feature('Test load runner')
+@allure.story('Comparison flags latency regressions')
+def test_compare_reports():
+    def report(p95):
+        stats = {'error_rate': 0.0, 'latency_ms': {'p95': p95, 'p99': p95}}
+        return {'endpoints': {'BOOKING_ENDPOINT': stats}}
+    assert compare(report(10), report(10.5)) == []
+    assert len(compare(report(10), report(20))) == 2
+
+@allure.feature('Test load runner')
+@allure.story('Bookings created by the mix are deleted after the run')
+def test_run_deletes_created_bookings(local_booking_server, tmp_path, monkeypatch):
+    if local_booking_server is None:
+        pytest.skip('needs the local booking server to list every stored booking')
+    # the number of requests depends on timing, which a cassette cannot replay
+    monkeypatch.delenv('CASSETTE_PATH', raising=False)
+    before = set(local_booking_server.store._bookings)
+    argv = ['--duration', '0.2', '--warmup', '0', '--concurrency', '2', '--mix', 'create_booking=1',
+            '--output', str(tmp_path / 'run.json'), '--reporting-level', steps.get_level().value]
+    assert main(argv) == 0
+    assert set(local_booking_server.store._bookings) <= before
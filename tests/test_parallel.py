@@ -0,0 +1,34 @@
+import allure
+
+from core.clients.api_client import APIClient
+from core.data.namespace import namespaced, parse_run_tag, run_tag
+from core.plugins.sharding import balance
+
+
+@allure.feature('Test parallel execution')
+@allure.story('Shards are balanced by runtime')
+def test_balance_shards():
+    durations = {'a': 8.0, 'b': 4.0, 'c': 4.0, 'd': 2.0, 'e': 1.0, 'f': 1.0, 'g': None}
+    buckets = balance(durations, 2)
+    assert sorted(nodeid for bucket in buckets for nodeid in bucket) == sorted(durations)
+    loads = [sum(durations[nodeid] or 2.0 for nodeid in bucket) for bucket in buckets]
+    assert abs(loads[0] - loads[1]) <= 2.0
+
+@allure.feature('Test parallel execution')
+@allure.story('Booking data is namespaced per worker')
+def test_namespaced_booking_data(generate_random_booking_data, worker_namespace):
+    assert generate_random_booking_data['lastname'].endswith(worker_namespace)
+    tag = parse_run_tag(namespaced({'lastname': 'Brown'}, run_tag('gw3'))['lastname'])
+    assert tag['worker'] == 'gw3'
+    assert parse_run_tag('Brown') is None
+
+@allure.feature('Test parallel execution')
+@allure.story('Client opens a new pool after fork')
+def test_client_resets_session_in_new_process():
+    client = APIClient()
+    client.session.headers.update({'X-Test': '1'})
+    inherited = client.session
+    client._pid = -1
+    client.ping()
+    assert client.session is not inherited
+    assert client.session.headers['X-Test'] == '1'
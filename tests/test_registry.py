@@ -0,0 +1,48 @@
+import allure
+
+from datetime import timedelta
+
+from core.tools.sweep_bookings import sweep
+
+
+@allure.feature('Test booking registry')
+@allure.story('Created bookings are recorded and deleted at teardown')
+def test_registry_records_and_tears_down(api_client, booking_registry, generate_random_booking_data):
+    created = [api_client.create_booking(generate_random_booking_data)['bookingid'] for _ in range(3)]
+    assert booking_registry.ids() == created
+    api_client.delete_booking(created[0])
+    assert created[0] not in booking_registry
+
+    assert booking_registry.teardown(api_client) == []
+    assert len(booking_registry) == 0
+    remaining = {item['bookingid'] for item in api_client.get_bookings_ids(params={'lastname': generate_random_booking_data['lastname']})}
+    assert not remaining & set(created)
+
+@allure.feature('Test booking registry')
+@allure.story('Bulk creations are recorded into the innermost registry')
+def test_registry_records_bulk_creations(api_client, module_booking_registry, booking_registry, generate_random_booking_data):
+    results = api_client.create_bookings_bulk([generate_random_booking_data] * 4)
+    assert sorted(booking_registry.ids()) == sorted(result.result['bookingid'] for result in results)
+    assert len(module_booking_registry) == 0
+
+@allure.feature('Test booking registry')
+@allure.story('Sweeper deletes bookings of old runs only')
+def test_sweeper_deletes_orphans(api_client, booking_registry, generate_random_booking_data):
+    old_run = '20200101000000abcd'
+    orphan = dict(generate_random_booking_data, lastname=f'Orphan-ddbrun-{old_run}-gw0')
+    orphan_id = api_client.create_booking(orphan)['bookingid']
+    current_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+
+    # filtered by lastname so the test never lists every booking of a shared backend
+    params = {'lastname': orphan['lastname']}
+    found, _ = sweep(api_client, older_than=timedelta(hours=1), dry_run=True, params=params)
+    assert orphan_id in found
+    found, _ = sweep(api_client, older_than=timedelta(hours=1), dry_run=True, params={'lastname': generate_random_booking_data['lastname']})
+    assert current_id not in found
+
+    found, _ = sweep(api_client, older_than=timedelta(hours=1), exclude_runs={old_run}, params=params)
+    assert orphan_id not in found
+
+    found, failed = sweep(api_client, older_than=timedelta(hours=1), params=params)
+    assert orphan_id in found and failed == []
+    assert {'bookingid': orphan_id} not in api_client.get_bookings_ids(params=params)
@@ -0,0 +1,100 @@
+import threading
+
+import allure
+import allure_commons
+import pytest
+
+from core.clients.bulk import run_bulk
+from core.reporting import steps
+from core.settings.config import ReportingLevel
+
+
+class StepRecorder:
+    def __init__(self):
+        self.started = []
+        self.failed = []
+        self.nested = []
+        self._open = []
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self.started.append(title)
+        self.nested.append((len(self._open), title.split(' [')[0]))
+        self._open.append(uuid)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        self._open.remove(uuid)
+        if exc_type is not None:
+            self.failed.append(uuid)
+
+@pytest.fixture()
+def recorder():
+    recorder = StepRecorder()
+    previous = steps.get_level()
+    allure_commons.plugin_manager.register(recorder)
+    yield recorder
+    allure_commons.plugin_manager.unregister(recorder)
+    steps.set_level(previous)
+
+@allure.feature('Test reporting levels')
+@allure.story('Summary level reports one step per title')
+def test_summary_level_aggregates(recorder):
+    steps.set_level(ReportingLevel.SUMMARY)
+    for _ in range(3):
+        with steps.step('Creating booking'):
+            with steps.step('Checking status code'):
+                pass
+    assert recorder.started == []
+    assert steps.flush() == 6
+    assert [title.split(' [')[0] for title in recorder.started] == ['Creating booking x3', 'Checking status code x3']
+    assert steps.flush() == 0
+
+@allure.feature('Test reporting levels')
+@allure.story('Buffered steps are replayed in detail on failure')
+def test_summary_level_replays_on_failure(recorder):
+    steps.set_level(ReportingLevel.SUMMARY)
+    with steps.step('Creating booking'):
+        pass
+    with pytest.raises(AssertionError):
+        with steps.step('Updating booking'):
+            with steps.step('Checking status code'):
+                raise AssertionError('Expected status code 200 but got 403')
+    steps.flush(failed=True)
+    assert [title.split(' [')[0] for title in recorder.started] == ['Creating booking', 'Updating booking', 'Checking status code']
+    assert len(recorder.failed) == 2
+
+@allure.feature('Test reporting levels')
+@allure.story('Steps of bulk workers replay under the step that started them')
+def test_replay_nests_bulk_steps(recorder):
+    steps.set_level(ReportingLevel.SUMMARY)
+    both_started = threading.Barrier(2)
+
+    def work(item):
+        with steps.step(f'Item {item}'):
+            both_started.wait()
+            with steps.step(f'Child {item}'):
+                pass
+
+    with steps.step('Bulk'):
+        list(run_bulk(work, [1, 2], max_workers=2))
+    steps.flush(failed=True)
+    assert recorder.nested[0] == (0, 'Bulk') and len(recorder.nested) == 5
+    for item in (1, 2):
+        position = recorder.nested.index((1, f'Item {item}'))
+        assert recorder.nested[position + 1] == (2, f'Child {item}')
+
+@allure.feature('Test reporting levels')
+@allure.story('Off level skips API steps')
+def test_off_level_records_nothing(recorder, api_client):
+    steps.set_level(ReportingLevel.OFF)
+    api_client.ping()
+    assert recorder.started == []
+    assert steps.flush() == 0
+
+@allure.feature('Test reporting levels')
+@allure.story('Full level reports steps live')
+def test_full_level_reports_live(recorder, api_client):
+    steps.set_level(ReportingLevel.FULL)
+    api_client.ping()
+    assert recorder.started == ['Ping API client', 'Assert status code']
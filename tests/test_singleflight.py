@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import pytest
+
+from core.clients.api_client import APIClient
+from core.clients.singleflight import SingleFlight
+
+
+def _slow_gets(client, delay=0.1):
+    calls = []
+    get = client.session.get
+
+    def spy(url, **kwargs):
+        calls.append(url)
+        time.sleep(delay)
+        return get(url, **kwargs)
+
+    client.session.get = spy
+    return calls
+
+def _concurrently(func, count):
+    start = threading.Barrier(count)
+
+    def run():
+        start.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(run) for _ in range(count)]
+        return [future.result() for future in futures]
+
+@allure.feature('Test request coalescing')
+@allure.story('Identical concurrent reads share one request')
+def test_identical_reads_share_request(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    client = APIClient()
+    calls = _slow_gets(client)
+
+    results = _concurrently(lambda: client.get_booking_by_id(booking_id), 8)
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert len({id(result) for result in results}) == len(results)
+    assert client.single_flight.stats() == {'requests': 1, 'coalesced': 7, 'in_flight': 0}
+
+    _concurrently(lambda: client.get_bookings_ids(params={'lastname': generate_random_booking_data['lastname']}), 4)
+    assert len(calls) == 2
+
+@allure.feature('Test request coalescing')
+@allure.story('Reads after a write do not join a flight started before it')
+def test_write_barrier(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    client = APIClient()
+    calls = _slow_gets(client, delay=0.3)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        before = executor.submit(client.get_booking_by_id, booking_id)
+        time.sleep(0.05)
+        client.partial_update_booking(booking_id, {'firstname': 'Coalesced'})
+        after = executor.submit(client.get_booking_by_id, booking_id)
+        assert after.result()['firstname'] == 'Coalesced'
+        before.result()
+    assert len(calls) == 2
+
+@allure.feature('Test request coalescing')
+@allure.story('Errors reach every waiter and are not cached')
+def test_errors_shared():
+    flight = SingleFlight()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        time.sleep(0.1)
+        raise ConnectionError('boom')
+
+    def call():
+        try:
+            flight.do('key', failing)
+        except ConnectionError as error:
+            return str(error)
+
+    assert _concurrently(call, 5) == ['boom'] * 5
+    assert len(attempts) == 1
+    assert flight.do('key', lambda: 'ok') == 'ok'
+    assert flight.stats()['in_flight'] == 0
+
+@allure.feature('Test request coalescing')
+@allure.story('Scopes separate flights across a barrier')
+def test_barrier_scopes():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def slow():
+        release.wait(1)
+        return {'value': 1}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(flight.do, 'key', slow, scopes=('booking:1',))
+        time.sleep(0.05)
+        with flight.barrier('booking:1'):
+            pass
+        second = executor.submit(flight.do, 'key', slow, scopes=('booking:1',))
+        time.sleep(0.05)
+        release.set()
+        assert first.result() == second.result() == {'value': 1}
+    assert flight.stats() == {'requests': 2, 'coalesced': 0, 'in_flight': 0}
+    assert flight._epochs == {}
+    with pytest.raises(KeyError):
+        flight.do('other', lambda: {}['missing'])
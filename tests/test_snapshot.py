@@ -0,0 +1,62 @@
+import allure
+import pytest
+
+from core.data.snapshot import BookingSnapshot
+from core.tools.export_bookings import sync
+
+
+def booking(firstname, price, checkin, checkout, deposit=True, needs=None):
+    return {'firstname': firstname, 'lastname': 'Brown', 'totalprice': price, 'depositpaid': deposit,
+            'bookingdates': {'checkin': checkin, 'checkout': checkout}, 'additionalneeds': needs}
+
+@allure.feature('Test bookings snapshot')
+@allure.story('Snapshot round-trips through memory-mapped columns')
+def test_snapshot_round_trip(tmp_path):
+    bookings = {
+        1: booking('Jim', 100, '2026-01-01', '2026-01-03', needs='Breakfast'),
+        2: booking('Sally', 300, '2026-02-01', '2026-02-02', deposit=False),
+        3: booking('Jim', 200, '2026-03-01', '2026-03-03'),
+    }
+    BookingSnapshot.from_bookings(bookings, {1: 'W/"a"'}).save(str(tmp_path))
+    with BookingSnapshot.load(str(tmp_path)) as snapshot:
+        assert isinstance(snapshot.columns['totalprice'], memoryview)
+        assert [snapshot.get(booking_id) for booking_id in bookings] == [dict(data, bookingid=booking_id) for booking_id, data in bookings.items()]
+        assert snapshot.dictionaries['firstname'] == ['Jim', 'Sally']
+        assert snapshot.etags == {1: 'W/"a"'}
+        assert snapshot.price_summary() == {'count': 3, 'sum': 600, 'min': 100, 'mean': 200.0, 'max': 300,
+                                            'p50': 200.0, 'p95': 290.0, 'p99': 298.0}
+        assert snapshot.stay_lengths() == {1: 1, 2: 2}
+        assert snapshot.deposit_share() == pytest.approx(2 / 3)
+        assert snapshot.top('firstname', 1) == [('Jim', 2)]
+
+@allure.feature('Test bookings snapshot')
+@allure.story('Malformed values are stored as nulls')
+def test_snapshot_nulls():
+    snapshot = BookingSnapshot.from_bookings({1: booking('Jim', None, '0NaN-aN-aN', '2026-01-03', deposit=None)})
+    assert snapshot.get(1)['totalprice'] is None
+    assert snapshot.get(1)['depositpaid'] is None
+    assert snapshot.get(1)['bookingdates'] == {'checkin': None, 'checkout': '2026-01-03'}
+    assert snapshot.price_summary() == {'count': 0}
+    assert snapshot.stay_lengths() == {}
+    huge = BookingSnapshot.from_bookings({2: booking('Jim', 10**30, '2026-01-01', '2026-01-03'), 3: booking('Jim', float('inf'), '2026-01-01', '2026-01-03')})
+    assert huge.get(2)['totalprice'] is None and huge.get(3)['totalprice'] is None
+
+@allure.feature('Test bookings snapshot')
+@allure.story('Later syncs fetch only new or changed bookings')
+def test_incremental_sync(api_client, booking_registry, generate_random_booking_data, tmp_path):
+    # a lastname no other test uses, random names repeat across tests that keep their bookings until the session ends
+    booking_data = dict(generate_random_booking_data, lastname=f"{generate_random_booking_data['lastname']}-snapshot")
+    params = {'lastname': booking_data['lastname']}
+    first, second, third = (api_client.create_booking(booking_data)['bookingid'] for _ in range(3))
+    snapshot, stats = sync(api_client, str(tmp_path), params=params)
+    assert sorted(snapshot.index()) == [first, second, third]
+    assert stats['new'] == 3
+
+    api_client.partial_update_booking(second, {'totalprice': 1})
+    api_client.delete_booking(third)
+    fourth = api_client.create_booking(booking_data)['bookingid']
+    snapshot, stats = sync(api_client, str(tmp_path), params=params)
+    assert sorted(snapshot.index()) == [first, second, fourth]
+    assert snapshot.get(second)['totalprice'] == 1
+    assert stats['new'] == 1 and stats['deleted'] == 1 and stats['failed'] == []
+    assert snapshot.etags and stats['not_modified'] == 1 and stats['refreshed'] == 1
@@ -0,0 +1,44 @@
+import allure
+import pytest
+
+from core.clients.api_client import APIClient
+from core.load.soak import MB, ResourceSample, SoakBudgets, SoakRunner, analyze, format_report
+
+
+@allure.feature('Test soak mode')
+@allure.story('Fitted growth is checked against budgets')
+def test_analyze_budgets():
+    samples = [ResourceSample(elapsed=second, iterations=second * 10, rss=100 * MB + second * MB, fds=20 + (second in (3, 4)), connections=2)
+               for second in range(10)]
+    result = analyze(samples, SoakBudgets(rss=5 * MB, traced=MB, fds=4, connections=4))
+    assert result['trends']['rss']['growth'] == pytest.approx(9 * MB)
+    assert result['trends']['rss']['per_hour'] == pytest.approx(3600 * MB)
+    assert result['trends']['rss']['rising']
+    assert not result['trends']['fds']['rising'] and not result['trends']['connections']['rising']
+    assert result['trends']['traced'] is None
+    assert result['violations'] == [f'rss grew by {9 * MB} (budget {5 * MB})']
+    assert analyze(samples, SoakBudgets(rss=None, error_rate=0.1), errors=9)['violations'] == []
+    assert analyze(samples, SoakBudgets(rss=None), errors=1)['violations'] == ['errors in 1 of 90 iterations (budget 0.00%)']
+
+@allure.feature('Test soak mode')
+@allure.story('Short soak run samples resources and reports growing allocation sites')
+def test_soak_run_reports_leak(monkeypatch):
+    # the number of iterations depends on timing, which a cassette cannot replay
+    monkeypatch.delenv('CASSETTE_PATH', raising=False)
+    leaked = []
+
+    class LeakyRunner(SoakRunner):
+        def lifecycle(self):
+            super().lifecycle()
+            leaked.append(bytearray(64 * 1024))
+
+    runner = LeakyRunner(APIClient(), duration=1.0, interval=0.2, warmup=0.1,
+                         budgets=SoakBudgets(traced=256 * 1024), frames=1, seed=1)
+    report = runner.run()
+    assert report['iterations'] > 0 and report['errors'] == {}
+    assert len(report['samples']) >= 2
+    assert report['samples'][-1]['fds'] is not None and report['samples'][-1]['connections'] >= 1
+    assert 'test_soak.py' in report['top_sites'][0]['site']
+    assert report['trends']['traced']['rising']
+    assert [violation.split()[0] for violation in report['violations']] == ['traced']
+    assert 'BUDGET EXCEEDED traced' in format_report(report)
@@ -0,0 +1,48 @@
+import allure
+import json
+import pytest
+
+from core.clients.streaming import iter_json_array
+
+
+def split(raw, size):
+    return [raw[index:index + size] for index in range(0, len(raw), size)]
+
+@allure.feature('Test streaming bookings ids')
+@allure.story('Array items are parsed across chunk borders')
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1024])
+def test_iter_json_array_chunks(chunk_size):
+    items = [{'bookingid': index, 'name': 'Zoë'} for index in range(50)] + [12345, 'text', None]
+    raw = json.dumps(items, indent=1).encode()
+    assert list(iter_json_array(split(raw, chunk_size))) == items
+
+@allure.feature('Test streaming bookings ids')
+@allure.story('Truncated body is reported')
+def test_iter_json_array_truncated():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"bookingid": 1}, {"booking']))
+    assert list(iter_json_array([b' [ ] '])) == []
+
+@allure.feature('Test streaming bookings ids')
+@allure.story('Positive: streaming filtered bookings ids')
+def test_iter_bookings_ids(api_client, generate_random_booking_data):
+    created = [api_client.create_booking(generate_random_booking_data)['bookingid'] for _ in range(3)]
+    params = {'firstname': generate_random_booking_data['firstname'], 'lastname': generate_random_booking_data['lastname']}
+    streamed = list(api_client.iter_bookings_ids(params=params, chunk_size=5))
+    assert set(created) <= set(streamed)
+    assert sorted(streamed) == sorted(item['bookingid'] for item in api_client.get_bookings_ids(params=params))
+
+@allure.feature('Test streaming bookings ids')
+@allure.story('Positive: streaming ids chained into booking lookups')
+def test_iter_bookings(api_client, generate_random_booking_data):
+    created = [api_client.create_booking(generate_random_booking_data)['bookingid'] for _ in range(3)]
+    params = {'firstname': generate_random_booking_data['firstname'], 'lastname': generate_random_booking_data['lastname']}
+    results = list(api_client.iter_bookings(params=params, prefetch=2))
+    assert set(created) <= {result.item for result in results}
+    assert all(result.ok and result.result['lastname'] == params['lastname'] for result in results)
+
+@allure.feature('Test streaming bookings ids')
+@allure.story('Negative: unsupported filter')
+def test_iter_bookings_ids_unsupported_filter(api_client):
+    with pytest.raises(ValueError):
+        list(api_client.iter_bookings_ids(params={'price': 1}))
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import allure
+import pytest
+from yarl import URL
+
+from core.clients.api_client import APIClient
+from core.clients.async_api_client import AsyncAPIClient
+from core.clients.endpoints import Endpoints
+from core.clients.throttle import AdaptiveLimiter, Throttle, ThrottlePolicy, TokenBucket
+from core.settings.environment import Environment
+
+
+@allure.feature('Test throttling')
+@allure.story('Token bucket spaces requests beyond the burst')
+def test_token_bucket_waits(fake_clock):
+    bucket = TokenBucket(rate=10, burst=2, clock=fake_clock)
+    assert [bucket.reserve() for _ in range(4)] == pytest.approx([0, 0, 0.1, 0.2])
+    fake_clock.now = 1.0
+    assert bucket.reserve() == 0
+    bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5)
+
+@allure.feature('Test throttling')
+@allure.story('Window grows additively and halves on errors')
+def test_aimd_window(fake_clock):
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=6, clock=fake_clock)
+    for _ in range(8):
+        fake_clock.now += 0.1
+        limiter.release(limiter.acquire() - 0.1, 200)
+    assert limiter.stats()['window'] == pytest.approx(5.7, abs=0.1)
+    limiter.release(limiter.acquire(), 429)
+    assert limiter.window == pytest.approx(2.85, abs=0.05)
+    limiter.release(limiter.acquire(), 503)
+    assert limiter.stats()['backoffs'] == 1
+    fake_clock.now += 1
+    limiter.release(limiter.acquire(), error=True)
+    assert limiter.stats()['backoffs'] == 2
+
+@allure.feature('Test throttling')
+@allure.story('Latency spikes shrink the window')
+def test_aimd_latency_spike(fake_clock):
+    limiter = AdaptiveLimiter(initial=8, latency_factor=3, clock=fake_clock)
+    started = limiter.acquire()
+    fake_clock.now += 0.1
+    limiter.release(started, 200)
+    started = limiter.acquire()
+    fake_clock.now += 1.0
+    limiter.release(started, 200)
+    assert limiter.stats()['backoffs'] == 1
+
+@allure.feature('Test throttling')
+@allure.story('A lasting latency shift becomes the new baseline')
+def test_aimd_latency_shift(fake_clock):
+    limiter = AdaptiveLimiter(initial=8, maximum=32, latency_factor=3, clock=fake_clock)
+    for latency in [0.01] * 200 + [0.05] * 200:
+        started = limiter.acquire()
+        fake_clock.now += latency
+        limiter.release(started, 200)
+    assert limiter.stats()['backoffs'] == 1
+    assert limiter.latency == pytest.approx(0.05)
+    assert limiter.window > 8
+
+@allure.feature('Test throttling')
+@allure.story('Lists and lookups by id keep separate windows on a shared rate')
+def test_limiter_per_route():
+    throttle = Throttle(ThrottlePolicy(rates={endpoint: 5 for endpoint in Endpoints}))
+    lookup = throttle.limiter(Endpoints.BOOKING_ENDPOINT, '/booking/12')
+    listing = throttle.limiter('/booking?lastname=X', '/booking?lastname=X')
+    assert lookup is throttle.limiter('/booking/7', '/booking/7')
+    assert lookup is not listing and lookup.bucket is listing.bucket
+    assert set(throttle.stats()) == {'BOOKING_ENDPOINT', 'BOOKING_ENDPOINT/{id}'}
+
+@allure.feature('Test throttling')
+@allure.story('Async requests find their route below a base url with a path prefix')
+def test_async_route_below_prefix():
+    throttle = Throttle(ThrottlePolicy(rates={endpoint: 5 for endpoint in Endpoints}))
+    client = AsyncAPIClient(throttle=throttle)
+    client.base_url = 'http://host/api'
+    path = client._relative(URL('http://host/api/booking/5?x=1'))
+    assert path == '/booking/5?x=1'
+    assert throttle.limiter(path, path) is throttle.limiter(Endpoints.BOOKING_ENDPOINT, '/booking/7')
+    assert client._relative(URL('http://other/booking')) == '/booking'
+
+@allure.feature('Test throttling')
+@allure.story('Callers beyond the window wait for a slot')
+def test_limiter_bounds_concurrency():
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+    peak, active, lock = [0], [0], threading.Lock()
+
+    def work():
+        started = limiter.acquire()
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        limiter.release(started, 200)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2 and limiter.in_flight == 0
+
+@allure.feature('Test throttling')
+@allure.story('Async callers share the limiter')
+def test_limiter_async():
+    limiter = AdaptiveLimiter(initial=1, maximum=1)
+
+    async def work():
+        started = await limiter.acquire_async()
+        await asyncio.sleep(0.001)
+        limiter.release(started, 200)
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(5)))
+
+    asyncio.run(main())
+    assert limiter.stats()['completed'] == 5
+
+@allure.feature('Test throttling')
+@allure.story('Limits are configured per environment and endpoint')
+def test_policy_per_environment_and_endpoint(monkeypatch):
+    assert not ThrottlePolicy.from_env(Environment.LOCAL).enabled
+    assert ThrottlePolicy.from_env(Environment.PROD).rates[Endpoints.BOOKING_ENDPOINT] == 10
+    monkeypatch.setenv('HTTP_AUTH_ENDPOINT_RATE', '1')
+    policy = ThrottlePolicy.from_env(Environment.LOCAL)
+    assert policy.enabled
+    assert policy.rates[Endpoints.AUTH_ENDPOINT] == 1 and policy.rates[Endpoints.BOOKING_ENDPOINT] == 0
+
+@allure.feature('Test throttling')
+@allure.story('Client requests pass through the limiter')
+def test_client_uses_throttle(api_client, booking_registry, generate_random_booking_data):
+    throttle = Throttle(ThrottlePolicy(rates={endpoint: 1000 for endpoint in Endpoints}))
+    client = APIClient(throttle=throttle)
+    client.create_bookings_bulk([generate_random_booking_data] * 6, max_workers=4)
+    for booking_id in client.registry.ids():
+        booking_registry.record(booking_id)
+    stats = throttle.stats()['BOOKING_ENDPOINT']
+    assert stats['completed'] == 6 and stats['in_flight'] == 0
@@ -0,0 +1,64 @@
+import json
+
+import allure
+import pytest
+
+from core.metrics.timing_store import TimingStore, order
+from core.plugins.timing import format_trends
+
+
+@pytest.fixture()
+def timing_store(tmp_path):
+    store = TimingStore(str(tmp_path / 'durations.json'))
+    store.record('run-1', [
+        ('t::slow', 'Booking', 'Create', 'passed', 4.0),
+        ('t::fast', 'Booking', 'Create', 'passed', 1.0),
+        ('t::flaky', 'Auth', 'Token', 'failed', 0.5),
+    ], finished=1.0)
+    store.record('run-2', [
+        ('t::slow', 'Booking', 'Create', 'passed', 6.0),
+        ('t::fast', 'Booking', 'Create', 'passed', 1.0),
+        ('t::flaky', 'Auth', 'Token', 'passed', 0.5),
+        ('t::skipped', None, None, 'skipped', 0.0),
+    ], finished=2.0)
+    return store
+
+@allure.feature('Test timing store')
+@allure.story('Durations and failures come from recent runs')
+def test_store_durations_and_failures(timing_store):
+    assert timing_store.runs() == ['run-2', 'run-1']
+    assert timing_store.durations() == {'t::slow': 5.0, 't::fast': 1.0, 't::flaky': 0.5}
+    assert timing_store.durations(history=1)['t::slow'] == 6.0
+    assert timing_store.recent_failures() == {'t::flaky'}
+    assert timing_store.recent_failures(runs=1) == set()
+
+@allure.feature('Test timing store')
+@allure.story('Durations files without run history still feed the store')
+def test_store_reads_plain_durations(tmp_path):
+    path = tmp_path / 'durations.json'
+    path.write_text(json.dumps({'t::old': 2.0, 't::slow': 9.0}))
+    store = TimingStore(str(path))
+    assert store.durations() == {'t::old': 2.0, 't::slow': 9.0} and store.runs() == []
+    for run in range(8):
+        store.record(f'run-{run}', [('t::slow', None, None, 'passed', float(run)), ('t::gone', None, None, 'skipped', 0.0)], finished=run)
+    assert store.runs() == [f'run-{run}' for run in range(7, 1, -1)]
+    assert store.durations() == {'t::old': 2.0, 't::slow': 5.0}
+    assert json.loads(path.read_text())['durations'] == {'t::old': 2.0, 't::slow': 7.0}
+
+@allure.feature('Test timing store')
+@allure.story('Recently failed tests run first, then the longest')
+def test_order_failed_then_longest(timing_store):
+    nodeids = ['t::new', 't::fast', 't::flaky', 't::slow']
+    assert order(nodeids, timing_store.durations(), timing_store.recent_failures()) == ['t::flaky', 't::slow', 't::new', 't::fast']
+    assert order(nodeids, {}, set()) == nodeids
+
+@allure.feature('Test timing store')
+@allure.story('Trends compare the latest run per feature and story')
+def test_trends(timing_store):
+    trends = {(trend['feature'], trend['story']): trend for trend in timing_store.trends()}
+    assert trends[('Booking', 'Create')]['change'] == pytest.approx(0.4)
+    assert trends[('Auth', 'Token')]['change'] == 0
+    assert trends[(None, None)]['baseline'] is None
+    lines = format_trends(timing_store.trends())
+    assert lines[0] == '! Booking / Create: 7.00s vs 5.00s (+40%)'
+    assert lines[-1] == '  - / -: 0.00s vs - (new)'
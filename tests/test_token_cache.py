@@ -0,0 +1,88 @@
+import allure
+import pytest
+import threading
+
+from core.clients.api_client import APIClient
+from core.clients.token_cache import TokenCache
+
+
+@allure.feature('Test token cache')
+@allure.story('Tokens expire after ttl')
+def test_token_cache_expiry(tmp_path, fake_clock):
+    cache = TokenCache(path=str(tmp_path / 'tokens.json'), ttl=60, clock=fake_clock)
+    cache.put('key', 'abc')
+    assert cache.get('key') == 'abc'
+    fake_clock.now += 61
+    assert cache.get('key') is None
+
+@allure.feature('Test token cache')
+@allure.story('Only one of concurrent callers authenticates')
+def test_token_cache_fetches_once(tmp_path):
+    path = str(tmp_path / 'tokens.json')
+    fetches = []
+    barrier = threading.Barrier(8)
+
+    def fetch():
+        fetches.append(1)
+        return 'token'
+
+    def worker(results):
+        barrier.wait()
+        results.append(TokenCache(path=path).get_or_fetch('key', fetch))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['token'] * 8
+    assert len(fetches) == 1
+
+@allure.feature('Test token cache')
+@allure.story('Invalidation keeps tokens refreshed by another process')
+def test_token_cache_invalidate_only_stale(tmp_path):
+    cache = TokenCache(path=str(tmp_path / 'tokens.json'))
+    cache.put('key', 'fresh')
+    assert not cache.invalidate('key', 'stale')
+    assert cache.get('key') == 'fresh'
+    assert cache.invalidate('key', 'fresh')
+    assert cache.get('key') is None
+
+@allure.feature('Test token cache')
+@allure.story('Clients share the cached token')
+def test_clients_share_token(tmp_path, mocker):
+    cache = TokenCache(path=str(tmp_path / 'tokens.json'))
+    first = APIClient(token_cache=cache)
+    first.auth()
+    second = APIClient(token_cache=cache)
+    spy = mocker.spy(second.session, 'post')
+    second.auth()
+    assert second.token == first.token
+    assert spy.call_count == 0
+
+@allure.feature('Test token cache')
+@allure.story('Write re-authenticates after 403')
+def test_write_reauthenticates_after_forbidden(local_booking_server, tmp_path, booking_registry, generate_random_booking_data):
+    if local_booking_server is None:
+        pytest.skip('needs the local booking server to revoke tokens')
+    client = APIClient(token_cache=TokenCache(path=str(tmp_path / 'tokens.json')))
+    client.auth()
+    booking_id = client.create_booking(generate_random_booking_data)['bookingid']
+    booking_registry.record(booking_id)
+    stale_token = client.token
+    local_booking_server.tokens.discard(stale_token)
+    response = client.partial_update_booking(booking_id, {'firstname': 'Renewed'})
+    assert response['firstname'] == 'Renewed'
+    assert client.token != stale_token
+
+@allure.feature('Test token cache')
+@allure.story('Clients authenticate on the first call that needs it')
+def test_lazy_authentication(tmp_path, generate_random_booking_data, mocker):
+    client = APIClient(token_cache=TokenCache(path=str(tmp_path / 'tokens.json')))
+    spy = mocker.spy(client, 'auth')
+    booking_id = client.create_booking(generate_random_booking_data)['bookingid']
+    client.get_booking_by_id(booking_id)
+    assert spy.call_count == 0 and client.token is None
+    client.delete_booking(booking_id)
+    assert spy.call_count == 1 and client.token is not None
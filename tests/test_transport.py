@@ -0,0 +1,71 @@
+import allure
+import pytest
+
+from core.clients.endpoints import Endpoints
+from core.clients.transport import TransportPolicy, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture()
+def offline_policy():
+    return TransportPolicy(failure_threshold=2, reset_timeout=60)
+
+@allure.feature('Test transport policy')
+@allure.story('Policy is configurable from environment')
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv('HTTP_POOL_MAXSIZE', '7')
+    monkeypatch.setenv('HTTP_CONNECT_TIMEOUT', '1.5')
+    monkeypatch.setenv('HTTP_BOOKING_ENDPOINT_READ_TIMEOUT', '42')
+    monkeypatch.setenv('HTTP_RETRY_STATUSES', '503,504')
+    policy = TransportPolicy.from_env()
+    assert policy.pool_maxsize == 7
+    assert policy.timeout_for(Endpoints.BOOKING_ENDPOINT) == (1.5, 42.0)
+    assert policy.timeout_for('/booking/1') == (1.5, 42.0)
+    assert policy.retry_statuses == (503, 504)
+
+@allure.feature('Test transport policy')
+@allure.story('Retries only idempotent methods')
+def test_policy_retry_only_idempotent_methods():
+    retry = TransportPolicy().build_retry()
+    assert retry.is_retry('GET', 503)
+    assert retry.is_retry('DELETE', 503)
+    assert not retry.is_retry('POST', 503)
+    assert not retry.is_retry('GET', 500)
+
+@allure.feature('Test transport policy')
+@allure.story('Session adapters use configured pool size')
+def test_client_mounts_pool(offline_client):
+    adapter = offline_client.session.get_adapter('http://example.com')
+    assert adapter._pool_maxsize == offline_client.policy.pool_maxsize
+    assert adapter.max_retries.total == offline_client.policy.retries
+
+@allure.feature('Test transport policy')
+@allure.story('Every call gets the endpoint timeout')
+def test_ping_uses_endpoint_timeout(offline_client, mocker):
+    mock_response = mocker.Mock()
+    mock_response.status_code = 201
+    mock_get = mocker.patch.object(offline_client.session, 'get', return_value=mock_response)
+    offline_client.ping()
+    assert mock_get.call_args.kwargs['timeout'] == offline_client.policy.timeout_for(Endpoints.PING_ENDPOINT)
+
+@allure.feature('Test transport policy')
+@allure.story('Circuit breaker opens after consecutive failures')
+def test_circuit_breaker_opens(offline_client, mocker):
+    mock_get = mocker.patch.object(offline_client.session, 'get', side_effect=ConnectionError('down'))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            offline_client.ping()
+    with pytest.raises(CircuitOpenError):
+        offline_client.ping()
+    assert mock_get.call_count == 2
+
+@allure.feature('Test transport policy')
+@allure.story('Circuit breaker closes after successful probe')
+def test_circuit_breaker_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_response(200)
+    assert breaker.state == CircuitBreaker.CLOSED
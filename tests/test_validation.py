@@ -0,0 +1,47 @@
+import allure
+import json
+import pytest
+
+from pydantic import ValidationError
+
+from core.clients import codec
+from core.models.booking import Booking, BookingId, BookingResponse
+from core.models.validation import validate_json, validate_many
+
+
+@allure.feature('Test response validation')
+@allure.story('Positive: creating booking validated from raw body')
+def test_create_booking_validated(api_client, generate_random_booking_data):
+    booking_data = generate_random_booking_data
+    response = api_client.create_booking(booking_data, validate=True)
+    assert isinstance(response, BookingResponse)
+    assert response.booking.firstname == booking_data['firstname']
+    assert response.booking.bookingdates.checkin.isoformat() == booking_data['bookingdates']['checkin']
+
+    booking = api_client.get_booking_by_id(response.bookingid, validate=True)
+    assert isinstance(booking, Booking)
+    assert booking == response.booking
+
+@allure.feature('Test response validation')
+@allure.story('Positive: bookings ids validated as one list')
+def test_get_bookings_ids_validated(api_client, generate_random_booking_data):
+    booking_id = api_client.create_booking(generate_random_booking_data)['bookingid']
+    bookings_ids = api_client.get_bookings_ids(validate=True)
+    assert all(isinstance(item, BookingId) for item in bookings_ids)
+    assert BookingId(bookingid=booking_id) in bookings_ids
+
+@allure.feature('Test response validation')
+@allure.story('Batch validation of several raw bodies')
+def test_validate_many():
+    raws = [json.dumps({'bookingid': index}).encode() for index in range(3)]
+    assert validate_many(BookingId, raws) == [BookingId(bookingid=index) for index in range(3)]
+    with pytest.raises(ValidationError):
+        validate_json(BookingId, b'{"bookingid": "abc"}')
+
+@allure.feature('Test response validation')
+@allure.story('Request codec handles integers outside 64 bits')
+def test_codec_big_integers():
+    assert json.loads(codec.dumps({'totalprice': 10**100})) == {'totalprice': 10**100}
+    assert codec.loads(codec.dumps({'a': [1, True, None]})) == {'a': [1, True, None]}
+    assert codec.loads(b'{"totalprice": 100000000000000000000000}') == {'totalprice': 10**23}
+    assert codec.loads(codec.dumps({'price': 10**100, 'id': 2**63 - 1})) == {'price': 10**100, 'id': 2**63 - 1}